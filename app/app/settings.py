@@ -40,6 +40,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     # my apps
     'core',
     'user',
@@ -51,6 +52,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.MetricsMiddleware',
+    'core.timeouts.RequestTimeoutMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -90,10 +93,66 @@ DATABASES = {
         'USER': os.environ.get("DB_USER"),
         'PASSWORD': os.environ.get("DB_PASS"),
         'HOST': os.environ.get("DB_HOST"),
-        'PORT': 5432,
+        'PORT': int(os.environ.get("DB_PORT", 5432)),
+        # Keep connections open between requests; 0 closes them after each
+        # request, None keeps them forever.
+        'CONN_MAX_AGE': (
+            None if os.environ.get('DB_CONN_MAX_AGE') == 'none'
+            else int(os.environ.get('DB_CONN_MAX_AGE', 60))
+        ),
+        # Ping reused connections at the start of each request
+        # (see core.db.close_unusable_connections).
+        'CONN_HEALTH_CHECKS': bool(
+            int(os.environ.get('DB_CONN_HEALTH_CHECKS', 1))
+        ),
+        # Required behind a transaction-pooling proxy such as PgBouncer,
+        # which cannot keep named cursors open across transactions.
+        'DISABLE_SERVER_SIDE_CURSORS': bool(
+            int(os.environ.get('DB_DISABLE_SERVER_SIDE_CURSORS', 0))
+        ),
+        'OPTIONS': {
+            'connect_timeout': int(os.environ.get('DB_CONNECT_TIMEOUT', 5)),
+        },
     }
 }
 
+# Cache
+# https://docs.djangoproject.com/en/3.2/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # Token and user snapshots for CachedTokenAuthentication (user app),
+    # which also carry the data versions behind recipe ETags. Point
+    # AUTH_CACHE_BACKEND/AUTH_CACHE_LOCATION at a cache shared by all
+    # workers (e.g. FileBasedCache, django_redis.cache.RedisCache or
+    # PyMemcacheCache) so invalidations reach every worker at once.
+    'auth': {
+        'BACKEND': os.environ.get(
+            'AUTH_CACHE_BACKEND',
+            'django.core.cache.backends.locmem.LocMemCache',
+        ),
+        'LOCATION': os.environ.get('AUTH_CACHE_LOCATION', 'auth-tokens'),
+        'TIMEOUT': int(os.environ.get('AUTH_TOKEN_CACHE_TTL', 300)),
+    },
+    # Rendered list/detail bodies, keyed by ETag (see recipe.caching).
+    'responses': {
+        'BACKEND': os.environ.get(
+            'RESPONSE_CACHE_BACKEND',
+            'django.core.cache.backends.locmem.LocMemCache',
+        ),
+        'LOCATION': os.environ.get('RESPONSE_CACHE_LOCATION', 'responses'),
+        'TIMEOUT': int(os.environ.get('RESPONSE_CACHE_TTL', 600)),
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.environ.get('RESPONSE_CACHE_MAX_ENTRIES', 1000)),
+        },
+    },
+}
+
+AUTH_TOKEN_CACHE_ALIAS = 'auth'
+RESPONSE_CACHE_ALIAS = 'responses'
+
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
 
@@ -112,6 +171,39 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Password hashing
+# https://docs.djangoproject.com/en/3.2/topics/auth/passwords/
+# New and changed passwords use PASSWORD_HASHER ("argon2", "scrypt" or
+# "pbkdf2"); the others are kept so existing hashes still verify and are
+# rehashed with the preferred hasher on the next successful login.
+
+_PASSWORD_HASHERS = {
+    'argon2': 'user.hashers.TunedArgon2PasswordHasher',
+    'scrypt': 'user.hashers.TunedScryptPasswordHasher',
+    'pbkdf2': 'user.hashers.PooledPBKDF2PasswordHasher',
+}
+_PREFERRED_HASHER = os.environ.get('PASSWORD_HASHER', 'argon2')
+PASSWORD_HASHERS = [
+    _PASSWORD_HASHERS[_PREFERRED_HASHER],
+    *(path for name, path in _PASSWORD_HASHERS.items()
+      if name != _PREFERRED_HASHER),
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+]
+# Defaults follow the OWASP password storage cheat sheet; raising them
+# upgrades stored hashes on login.
+ARGON2_TIME_COST = int(os.environ.get('ARGON2_TIME_COST', 2))
+ARGON2_MEMORY_COST = int(os.environ.get('ARGON2_MEMORY_COST', 19456))  # KiB
+ARGON2_PARALLELISM = int(os.environ.get('ARGON2_PARALLELISM', 1))
+SCRYPT_WORK_FACTOR = int(os.environ.get('SCRYPT_WORK_FACTOR', 2 ** 14))
+SCRYPT_BLOCK_SIZE = int(os.environ.get('SCRYPT_BLOCK_SIZE', 8))
+SCRYPT_PARALLELISM = int(os.environ.get('SCRYPT_PARALLELISM', 1))
+# Hashes run on a pool of this many threads per process, with up to
+# PASSWORD_HASH_QUEUE more waiting; a login that cannot get a slot within
+# PASSWORD_HASH_WAIT seconds gets a 429 instead of tying up the worker.
+PASSWORD_HASH_THREADS = int(os.environ.get('PASSWORD_HASH_THREADS', 2))
+PASSWORD_HASH_QUEUE = int(os.environ.get('PASSWORD_HASH_QUEUE', 16))
+PASSWORD_HASH_WAIT = float(os.environ.get('PASSWORD_HASH_WAIT', 5))
+
 # Internationalization
 # https://docs.djangoproject.com/en/3.2/topics/i18n/
 
@@ -132,7 +224,43 @@ STATIC_URL = '/static/static/'
 MEDIA_URL = '/static/media/'
 
 MEDIA_ROOT = '/vol/web/media'
-STATIC_ROOT = '/vol/web/static'
+# The Dockerfile runs collectstatic into /build/static and scripts/run.sh
+# copies it here.
+STATIC_ROOT = os.environ.get('STATIC_ROOT', '/vol/web/static')
+# collectstatic writes content-hashed copies (and .gz files) which the
+# proxy serves with long-lived cache headers; see proxy/static.conf.
+STATICFILES_STORAGE = 'core.storage.CompressedManifestStaticFilesStorage'
+
+# Threads per process resizing uploaded recipe images (see recipe.images).
+IMAGE_RENDITION_WORKERS = int(os.environ.get('IMAGE_RENDITION_WORKERS', 2))
+
+# Queries at least this slow are logged by core.middleware; an empty value
+# disables the log.
+SLOW_QUERY_THRESHOLD_MS = (
+    float(os.environ.get('SLOW_QUERY_THRESHOLD_MS', 500))
+    if os.environ.get('SLOW_QUERY_THRESHOLD_MS') != '' else None
+)
+# Also log the bound parameters of slow queries; only honoured with DEBUG,
+# as they include credentials and personal data.
+SLOW_QUERY_LOG_PARAMS = bool(int(os.environ.get('SLOW_QUERY_LOG_PARAMS', 0)))
+# /metrics requires "Authorization: Bearer <token>"; when unset it is only
+# served with DEBUG and answers 404 otherwise.
+METRICS_AUTH_TOKEN = os.environ.get('METRICS_AUTH_TOKEN')
+# Address of the uWSGI stats server (see scripts/run.sh); when set, its
+# worker and listen queue stats are added to /metrics.
+UWSGI_STATS = os.environ.get('UWSGI_STATS')
+
+# Seconds a request may run before uWSGI kills its worker (harakiri), and
+# the longer limit of bulk imports and exports; keep the latter in line
+# with the import location's timeouts in proxy/default.conf.tpl.
+REQUEST_TIMEOUT = int(os.environ.get('UWSGI_HARAKIRI', 60))
+BULK_REQUEST_TIMEOUT = int(os.environ.get('UWSGI_BULK_HARAKIRI', 600))
+
+# "wsgi" serves the app with uWSGI, "asgi" with uvicorn and the async views
+# in recipe.urls (see scripts/run.sh).
+SERVER_MODE = os.environ.get('SERVER_MODE', 'wsgi')
+# Threads per ASGI worker running wrapped views; each holds a DB connection.
+ASYNC_VIEW_THREADS = int(os.environ.get('ASYNC_VIEW_THREADS', 8))
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/3.2/ref/settings/#default-auto-field
@@ -144,6 +272,24 @@ REST_FRAMEWORK = {
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema'
 }
 
+# Render and parse JSON with orjson (see core.renderers and core.parsers).
+if bool(int(os.environ.get('FAST_JSON', 0))):
+    REST_FRAMEWORK.update({
+        'DEFAULT_RENDERER_CLASSES': [
+            'core.renderers.FastJSONRenderer',
+            'rest_framework.renderers.BrowsableAPIRenderer',
+        ],
+        'DEFAULT_PARSER_CLASSES': [
+            'core.parsers.FastJSONParser',
+            'rest_framework.parsers.FormParser',
+            'rest_framework.parsers.MultiPartParser',
+        ],
+    })
+
 SPECTACULAR_SETTINGS = {
     'COMPONENT_SPLIT_REQUEST': True,
-}
\ No newline at end of file
+}
+# core.schema keeps the generated schema here, one file per code version;
+# scripts/run.sh fills it with the build_schema command at startup.
+SCHEMA_CACHE_DIR = os.environ.get('SCHEMA_CACHE_DIR', '/vol/web/schema')
+SCHEMA_CACHE_MAX_AGE = int(os.environ.get('SCHEMA_CACHE_MAX_AGE', 300))
\ No newline at end of file
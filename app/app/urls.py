@@ -15,23 +15,29 @@ Including another URLconf
 """
 from django.contrib import admin
 from django.urls import path, include
-from drf_spectacular.views import (SpectacularAPIView,
-                                   SpectacularSwaggerView)
+from drf_spectacular.views import SpectacularSwaggerView
 from django.conf.urls.static import static
 from django.conf import settings
 
+from core.metrics import metrics_view
+from core.schema import CachedSpectacularAPIView
+
 urlpatterns = [
     path('admin/', admin.site.urls),
-    path('api/schema/', SpectacularAPIView.as_view(), name='api-schema'),
+    path('api/schema/', CachedSpectacularAPIView.as_view(),
+         name='api-schema'),
     # Optional UI:
     path('api/docs/', SpectacularSwaggerView.as_view(url_name='api-schema'),
          name='api-docs'),
     # path('api/schema/redoc/', SpectacularRedocView.as_view(
     # url_name='schema'),name='redoc'),
     path('api/user/', include('user.urls')),
-    path('api/recipe/', include('recipe.urls'))
+    path('api/recipe/', include('recipe.urls')),
+    path('metrics', metrics_view, name='metrics'),
 ]
 
+# Only for the runserver dev setup; behind the proxy, nginx serves media
+# (proxy/static.conf) and these bytes never reach Django.
 if settings.DEBUG:
     urlpatterns += static(
         settings.MEDIA_URL,
@@ -10,7 +10,13 @@ https://docs.djangoproject.com/en/3.2/howto/deployment/wsgi/
 import os
 
 from django.core.wsgi import get_wsgi_application
+from django.urls import get_resolver
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'app.settings')
 
 application = get_wsgi_application()
+
+# uWSGI imports this module in the master and forks the workers from it,
+# so import the URLconf and views now as well; the workers then share them
+# copy-on-write instead of each importing them on its first request.
+get_resolver().url_patterns
@@ -1,6 +1,45 @@
 from django.apps import AppConfig
+from django.core.signals import request_started
+from django.db.backends.signals import connection_created
+from django.db.models.signals import (
+    pre_save,
+    post_save,
+    pre_delete,
+    post_delete,
+    m2m_changed,
+)
 
 
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        from . import db, search, summary
+        from .models import Recipe, Tag, Ingredient
+
+        connection_created.connect(db.count_connection_created)
+        request_started.connect(db.close_unusable_connections)
+
+        post_save.connect(search.update_on_recipe_save, sender=Recipe)
+        post_save.connect(search.update_on_ingredient_save, sender=Ingredient)
+        pre_delete.connect(
+            search.remember_ingredient_recipes, sender=Ingredient,
+        )
+        post_delete.connect(
+            search.update_on_ingredient_delete, sender=Ingredient,
+        )
+        m2m_changed.connect(
+            search.update_on_ingredients_changed,
+            sender=Recipe.ingredients.through,
+        )
+
+        pre_save.connect(summary.set_empty_summary, sender=Recipe)
+        for model in (Tag, Ingredient):
+            post_save.connect(summary.update_on_rename, sender=model)
+            pre_delete.connect(summary.remember_recipes, sender=model)
+            post_delete.connect(summary.update_on_delete, sender=model)
+        for through in (Recipe.tags.through, Recipe.ingredients.through):
+            m2m_changed.connect(
+                summary.update_on_links_changed, sender=through,
+            )
@@ -0,0 +1,85 @@
+"""
+Async wrappers running synchronous views in a thread pool.
+"""
+import asyncio
+import contextvars
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections, connections
+
+from .db import close_unusable_connections
+from .middleware import record_queries
+
+_executor = None
+
+
+def get_executor():
+    """Return the process-wide pool running wrapped views.
+
+    Each thread keeps its own database connection, so the pool size caps
+    the connections an ASGI worker opens.
+    """
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.ASYNC_VIEW_THREADS,
+            thread_name_prefix='async-views',
+        )
+    return _executor
+
+
+def shutdown_executor():
+    """Close every pool thread's database connection and stop the pool."""
+    global _executor
+    if _executor is None:
+        return
+    # Park one job on each thread so every thread closes its own.
+    barrier = threading.Barrier(settings.ASYNC_VIEW_THREADS)
+
+    def close():
+        barrier.wait()
+        connections.close_all()
+
+    for _ in range(settings.ASYNC_VIEW_THREADS):
+        _executor.submit(close)
+    _executor.shutdown(wait=True)
+    _executor = None
+
+
+def _call_view(view, request, *args, **kwargs):
+    """Run view and render its response on a pool thread."""
+    # request_started/finished only clean up the connections of the
+    # thread serving the request, so do it for this thread here.
+    close_old_connections()
+    close_unusable_connections()
+    try:
+        with record_queries(request):
+            response = view(request, *args, **kwargs)
+            if hasattr(response, 'render') and callable(response.render):
+                response = response.render()
+        return response
+    finally:
+        close_old_connections()
+
+
+def async_view(view):
+    """Return an async version of a sync view.
+
+    Under Django 3.2's ASGI handler every sync view of a process runs on
+    one shared thread; this runs view on a bounded pool instead so
+    requests waiting on the database no longer queue behind each other.
+    """
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(
+            get_executor(),
+            functools.partial(
+                context.run, _call_view, view, request, *args, **kwargs
+            ),
+        )
+    return wrapper
@@ -0,0 +1,42 @@
+"""
+Database connection lifecycle helpers.
+"""
+import logging
+
+from django.db import connections
+
+from .metrics import CONNECTIONS_CREATED
+
+logger = logging.getLogger(__name__)
+
+# Number of new database connections opened by this process. Compare it
+# against the request count to see how often connections are reused.
+connections_created = 0
+
+
+def count_connection_created(sender, connection, **kwargs):
+    """Count and log a newly opened database connection."""
+    global connections_created
+    connections_created += 1
+    CONNECTIONS_CREATED.inc()
+    logger.debug(
+        'Opened database connection for %r (%d in this process).',
+        connection.alias, connections_created,
+    )
+
+
+def close_unusable_connections(**kwargs):
+    """Close persistent connections that fail a health check.
+
+    Backports Django 4.1's CONN_HEALTH_CHECKS: a reused connection is
+    pinged at the start of each request and dropped if the server went
+    away, so the request opens a fresh one instead of failing.
+    """
+    for conn in connections.all():
+        if (
+            conn.settings_dict.get('CONN_HEALTH_CHECKS')
+            and conn.connection is not None
+            and not conn.is_usable()
+        ):
+            logger.info('Closing unusable connection %r.', conn.alias)
+            conn.close()
@@ -0,0 +1,318 @@
+"""
+Django command to benchmark the API routes against the current database.
+"""
+import io
+import json
+import math
+import os
+import platform
+import statistics
+import subprocess
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from urllib.parse import urlparse
+
+import django
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from PIL import Image
+from rest_framework.test import APIClient
+
+from core.models import Recipe
+from recipe.images import shutdown_executor
+
+BENCHMARK_TITLE = 'Benchmark recipe'
+# Recipes created for recipe-update/upload-image when recipe-create did
+# not run first.
+THROWAWAY_RECIPES = 10
+SCENARIOS = [
+    'token',
+    'recipe-list',
+    'recipe-detail',
+    'tag-list',
+    'ingredient-list',
+    'recipe-create',
+    'recipe-update',
+    'upload-image',
+]
+
+
+def percentile(values, pct):
+    """Return the nearest-rank percentile of values."""
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def git_commit():
+    """Return the current git commit, if available."""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def sample_jpeg():
+    """Return the bytes of a camera-sized JPEG."""
+    buffer = io.BytesIO()
+    Image.new('RGB', (2000, 1500), (200, 120, 40)).save(
+        buffer, format='JPEG', quality=90,
+    )
+    return buffer.getvalue()
+
+
+class Command(BaseCommand):
+    """Django command to benchmark the API."""
+    help = ('Report latency percentiles, queries and allocations per request '
+            'for the main API routes.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--email', default='bench-0@example.com',
+                            help='Seeded user to authenticate as.')
+        parser.add_argument('--password', default='benchpass123')
+        parser.add_argument('--iterations', type=int, default=50)
+        parser.add_argument('--warmup', type=int, default=5)
+        parser.add_argument(
+            '--scenarios', default=','.join(SCENARIOS),
+            help='Comma separated subset of: ' + ', '.join(SCENARIOS),
+        )
+        parser.add_argument(
+            '--cached', action='store_true',
+            help='Keep the response cache warm instead of clearing it '
+                 'before every GET.',
+        )
+        parser.add_argument(
+            '--allocations', action='store_true',
+            help='Trace memory allocations (slows every request down).',
+        )
+        parser.add_argument('--output', default=None,
+                            help='JSON file to write the results to.')
+        parser.add_argument('--compare', default=None,
+                            help='Earlier results file to compare against.')
+
+    def _requests(self, name, client, state):
+        """Return a callable issuing one request for the scenario."""
+        if name == 'token':
+            return lambda i: client.post(
+                reverse('user:token'),
+                {'email': state['email'], 'password': state['password']},
+            )
+        if name == 'recipe-list':
+            return lambda i: client.get(reverse('recipe:recipe-list'))
+        if name == 'recipe-detail':
+            ids = state['recipe_ids']
+            return lambda i: client.get(
+                reverse('recipe:recipe-detail', args=[ids[i % len(ids)]])
+            )
+        if name == 'tag-list':
+            return lambda i: client.get(reverse('recipe:tag-list'))
+        if name == 'ingredient-list':
+            return lambda i: client.get(reverse('recipe:ingredient-list'))
+        if name == 'recipe-create':
+            def create(i):
+                res = client.post(reverse('recipe:recipe-list'), {
+                    'title': f'{BENCHMARK_TITLE} {i}',
+                    'time_minutes': 30,
+                    'price': '9.99',
+                    'tags': [{'name': f'Tag {n}'} for n in range(3)],
+                    'ingredients': [
+                        {'name': f'Ingredient {n}'} for n in range(8)
+                    ],
+                }, format='json')
+                if res.status_code == 201:
+                    state['created_ids'].append(res.data['id'])
+                return res
+            return create
+        if name in ('recipe-update', 'upload-image'):
+            ids = self._throwaway_ids(state)
+            if name == 'recipe-update':
+                return lambda i: client.patch(
+                    reverse('recipe:recipe-detail', args=[ids[i % len(ids)]]),
+                    {'time_minutes': 10 + i % 50},
+                    format='json',
+                )
+            image = sample_jpeg()
+
+            def upload(i):
+                res = client.post(
+                    reverse('recipe:recipe-upload-image',
+                            args=[ids[i % len(ids)]]),
+                    {'image': SimpleUploadedFile(
+                        'bench.jpg', image, content_type='image/jpeg',
+                    )},
+                    format='multipart',
+                )
+                if res.status_code == 200:
+                    # Replaced images stay in storage; remember them all.
+                    path = urlparse(res.data['image']).path
+                    state['uploaded'].append(path[len(settings.MEDIA_URL):])
+                return res
+            return upload
+        raise CommandError(f'Unknown scenario "{name}".')
+
+    def _throwaway_ids(self, state):
+        """Return ids of recipes the write scenarios may modify.
+
+        These are the ones recipe-create made, or else a few created here,
+        so that the seeded recipes are never changed.
+        """
+        if not state['created_ids']:
+            user = get_user_model().objects.get(email=state['email'])
+            state['created_ids'] = [
+                Recipe.objects.create(
+                    user=user, title=f'{BENCHMARK_TITLE} {n}',
+                    time_minutes=30, price='9.99',
+                ).pk
+                for n in range(THROWAWAY_RECIPES)
+            ]
+        return list(state['created_ids'])
+
+    def _run(self, name, request, options):
+        """Issue warmup and measured requests and summarise them."""
+        response_cache = caches[settings.RESPONSE_CACHE_ALIAS]
+        latencies, queries, allocations, statuses = [], [], [], {}
+        for i in range(options['warmup'] + options['iterations']):
+            if not options['cached']:
+                response_cache.clear()
+            if options['allocations']:
+                tracemalloc.reset_peak()
+                baseline = tracemalloc.get_traced_memory()[0]
+            with CaptureQueriesContext(connection) as ctx:
+                start = time.perf_counter()
+                res = request(i)
+                elapsed = time.perf_counter() - start
+            if i < options['warmup']:
+                continue
+            latencies.append(elapsed * 1000)
+            queries.append(len(ctx.captured_queries))
+            if options['allocations']:
+                allocations.append(
+                    (tracemalloc.get_traced_memory()[1] - baseline) / 1024
+                )
+            statuses[res.status_code] = statuses.get(res.status_code, 0) + 1
+
+        result = {
+            'requests': len(latencies),
+            'status_codes': {str(k): v for k, v in statuses.items()},
+            'p50_ms': round(percentile(latencies, 50), 3),
+            'p95_ms': round(percentile(latencies, 95), 3),
+            'p99_ms': round(percentile(latencies, 99), 3),
+            'mean_ms': round(statistics.mean(latencies), 3),
+            'queries_mean': round(statistics.mean(queries), 2),
+            'queries_max': max(queries),
+        }
+        if allocations:
+            result['alloc_peak_kib_mean'] = round(
+                statistics.mean(allocations), 1,
+            )
+        return result
+
+    def _cleanup(self, state):
+        """Delete recipes and images created by the benchmark."""
+        shutdown_executor(wait=True)
+        for recipe in Recipe.objects.filter(pk__in=state['created_ids']):
+            for formats in recipe.image_renditions.values():
+                for path in formats.values():
+                    default_storage.delete(path)
+            recipe.delete()
+        for name in state['uploaded']:
+            default_storage.delete(name)
+
+    def _compare(self, results, path):
+        """Print p50/p95 changes relative to an earlier results file."""
+        with open(path) as f:
+            baseline = json.load(f)['scenarios']
+        self.stdout.write(f'\nCompared with {path}:')
+        for name, result in results.items():
+            if name not in baseline:
+                continue
+            for key in ('p50_ms', 'p95_ms', 'queries_mean'):
+                before, after = baseline[name][key], result[key]
+                change = (after - before) / before * 100 if before else 0
+                self.stdout.write(
+                    f'  {name:<16} {key:<13} {before:>9} -> {after:>9} '
+                    f'({change:+.1f}%)'
+                )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command"""
+        names = [n for n in options['scenarios'].split(',') if n]
+        state = {
+            'email': options['email'],
+            'password': options['password'],
+            'created_ids': [],
+            'uploaded': [],
+        }
+        client = APIClient()
+        if options['allocations']:
+            tracemalloc.start()
+
+        results = {}
+        hosts = [*settings.ALLOWED_HOSTS, 'testserver']
+        with override_settings(ALLOWED_HOSTS=hosts):
+            res = client.post(reverse('user:token'), {
+                'email': options['email'], 'password': options['password'],
+            })
+            if res.status_code != 200:
+                raise CommandError(
+                    f"Cannot log in as {options['email']}; "
+                    'run seed_recipes first.'
+                )
+            client.credentials(HTTP_AUTHORIZATION=f"Token {res.data['token']}")
+            state['recipe_ids'] = list(
+                Recipe.objects.filter(user__email=options['email'])
+                .order_by('-id').values_list('id', flat=True)[:100]
+            )
+            if not state['recipe_ids']:
+                raise CommandError(f"{options['email']} has no recipes.")
+
+            try:
+                for name in names:
+                    request = self._requests(name, client, state)
+                    results[name] = self._run(name, request, options)
+                    r = results[name]
+                    self.stdout.write(
+                        f"{name:<16} p50 {r['p50_ms']:>8.2f} ms  "
+                        f"p95 {r['p95_ms']:>8.2f} ms  "
+                        f"p99 {r['p99_ms']:>8.2f} ms  "
+                        f"queries {r['queries_mean']:>6}"
+                    )
+            finally:
+                self._cleanup(state)
+
+        report = {
+            'commit': git_commit(),
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'options': {
+                key: options[key] for key in (
+                    'email', 'iterations', 'warmup', 'cached', 'allocations',
+                )
+            },
+            'scenarios': results,
+        }
+        output = options['output'] or os.path.join(
+            'benchmark-results',
+            f"{datetime.now():%Y%m%d-%H%M%S}-{report['commit'] or 'local'}"
+            '.json',
+        )
+        os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+        with open(output, 'w') as f:
+            json.dump(report, f, indent=2)
+        self.stdout.write(self.style.SUCCESS(f'Results written to {output}'))
+
+        if options['compare']:
+            self._compare(results, options['compare'])
@@ -0,0 +1,186 @@
+"""
+Django command to measure API throughput while slow clients are connected.
+"""
+import asyncio
+import json
+import os
+import statistics
+import time
+from datetime import datetime, timezone
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import reverse
+
+from .benchmark_api import git_commit, percentile
+
+
+def build_request(method, host, path, headers=None, body=b''):
+    """Return the bytes of an HTTP/1.1 request closing its connection."""
+    lines = [f'{method} {path} HTTP/1.1', f'Host: {host}',
+             'Connection: close', f'Content-Length: {len(body)}']
+    lines += [f'{name}: {value}' for name, value in (headers or {}).items()]
+    return ('\r\n'.join(lines) + '\r\n\r\n').encode() + body
+
+
+async def send(address, request, trickle_seconds=0):
+    """Send request, optionally spread over trickle_seconds; return status."""
+    reader, writer = await asyncio.open_connection(*address)
+    try:
+        if trickle_seconds:
+            chunks = [request[i:i + 16] for i in range(0, len(request), 16)]
+            for chunk in chunks:
+                writer.write(chunk)
+                await writer.drain()
+                await asyncio.sleep(trickle_seconds / len(chunks))
+        else:
+            writer.write(request)
+            await writer.drain()
+        response = await reader.read()
+    finally:
+        writer.close()
+    status_line, _, rest = response.partition(b'\r\n')
+    return int(status_line.split()[1]), rest.partition(b'\r\n\r\n')[2]
+
+
+class Command(BaseCommand):
+    """Django command to benchmark concurrency under slow clients."""
+    help = ('Hammer one route with fast clients while other clients send '
+            'their requests slowly, and report the fast clients\' '
+            'throughput and latency.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='http://localhost:8000',
+                            help='Base URL of the running server or proxy.')
+        parser.add_argument('--path', default='/api/recipe/recipes/')
+        parser.add_argument('--slow-path', default=None,
+                            help='Route the slow clients request '
+                                 '(defaults to --path).')
+        parser.add_argument('--email', default='bench-0@example.com')
+        parser.add_argument('--password', default='benchpass123')
+        parser.add_argument('--clients', type=int, default=16)
+        parser.add_argument('--slow-clients', type=int, default=0)
+        parser.add_argument(
+            '--slow-seconds', type=float, default=5,
+            help='Time each slow client takes to send its request.',
+        )
+        parser.add_argument('--duration', type=float, default=10)
+        parser.add_argument('--output', default=None)
+        parser.add_argument('--compare', default=None,
+                            help='Earlier results file to compare against.')
+
+    async def _login(self, address, host, options):
+        body = json.dumps({
+            'email': options['email'], 'password': options['password'],
+        }).encode()
+        status, content = await send(address, build_request(
+            'POST', host, reverse('user:token'),
+            {'Content-Type': 'application/json'}, body,
+        ))
+        if status != 200:
+            raise CommandError(
+                f"Cannot log in as {options['email']} (HTTP {status})."
+            )
+        return json.loads(content)['token']
+
+    async def _client(self, address, request, deadline, trickle, results):
+        while time.monotonic() < deadline:
+            start = time.perf_counter()
+            try:
+                status, _ = await send(address, request, trickle)
+            except OSError:
+                results['errors'] += 1
+                continue
+            results['latencies'].append(
+                (time.perf_counter() - start) * 1000
+            )
+            results['statuses'][status] = (
+                results['statuses'].get(status, 0) + 1
+            )
+
+    async def _run(self, options):
+        url = urlsplit(options['url'])
+        address = (url.hostname, url.port or 80)
+        host = url.netloc
+        token = await self._login(address, host, options)
+        headers = {'Authorization': f'Token {token}'}
+        fast_request = build_request('GET', host, options['path'], headers)
+        slow_request = build_request(
+            'GET', host, options['slow_path'] or options['path'], headers,
+        )
+
+        fast = {'latencies': [], 'statuses': {}, 'errors': 0}
+        slow = {'latencies': [], 'statuses': {}, 'errors': 0}
+        deadline = time.monotonic() + options['duration']
+        await asyncio.gather(*(
+            [self._client(address, fast_request, deadline, 0, fast)
+             for _ in range(options['clients'])]
+            + [self._client(address, slow_request, deadline,
+                            options['slow_seconds'], slow)
+               for _ in range(options['slow_clients'])]
+        ))
+        return fast, slow
+
+    def _compare(self, result, path):
+        """Print changes relative to an earlier results file."""
+        with open(path) as f:
+            baseline = json.load(f)['fast_clients']
+        self.stdout.write(f'\nCompared with {path}:')
+        for key in ('requests_per_second', 'p50_ms', 'p95_ms', 'p99_ms'):
+            before, after = baseline[key], result[key]
+            change = (after - before) / before * 100 if before else 0
+            self.stdout.write(
+                f'  {key:<20} {before:>9} -> {after:>9} ({change:+.1f}%)'
+            )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command"""
+        fast, slow = asyncio.run(self._run(options))
+        if not fast['latencies']:
+            raise CommandError('No fast request completed.')
+
+        latencies = fast['latencies']
+        result = {
+            'requests': len(latencies),
+            'requests_per_second': round(
+                len(latencies) / options['duration'], 1,
+            ),
+            'errors': fast['errors'],
+            'status_codes': {str(k): v for k, v in fast['statuses'].items()},
+            'p50_ms': round(percentile(latencies, 50), 3),
+            'p95_ms': round(percentile(latencies, 95), 3),
+            'p99_ms': round(percentile(latencies, 99), 3),
+            'mean_ms': round(statistics.mean(latencies), 3),
+        }
+        self.stdout.write(
+            f"{result['requests_per_second']} req/s, "
+            f"p50 {result['p50_ms']} ms, p95 {result['p95_ms']} ms, "
+            f"p99 {result['p99_ms']} ms, {result['errors']} errors; "
+            f"{len(slow['latencies'])} slow requests completed."
+        )
+
+        report = {
+            'commit': git_commit(),
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'options': {
+                key: options[key] for key in (
+                    'url', 'path', 'slow_path', 'clients', 'slow_clients',
+                    'slow_seconds', 'duration',
+                )
+            },
+            'fast_clients': result,
+            'slow_requests_completed': len(slow['latencies']),
+            'slow_errors': slow['errors'],
+        }
+        output = options['output'] or os.path.join(
+            'benchmark-results',
+            f"{datetime.now():%Y%m%d-%H%M%S}-concurrency-"
+            f"{report['commit'] or 'local'}.json",
+        )
+        os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+        with open(output, 'w') as f:
+            json.dump(report, f, indent=2)
+        self.stdout.write(self.style.SUCCESS(f'Results written to {output}'))
+
+        if options['compare']:
+            self._compare(result, options['compare'])
@@ -0,0 +1,60 @@
+"""
+Django command to compare password hasher cost and login throughput.
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth.hashers import get_hasher, get_hashers
+from django.core.management.base import BaseCommand
+
+from user import hashers
+from .benchmark_api import percentile
+
+
+class Command(BaseCommand):
+    """Django command to benchmark password hashers."""
+    help = ('Verify a password with each configured hasher from several '
+            'concurrent clients, through the bounded hashing pool, and '
+            'report latency and logins per second.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clients', type=int, default=8,
+                            help='Concurrent logins in flight.')
+        parser.add_argument('--logins', type=int, default=64,
+                            help='Verifications per hasher.')
+        parser.add_argument('--hasher', action='append', default=None,
+                            help='Algorithm to benchmark (repeatable); '
+                                 'defaults to every configured hasher.')
+
+    def _verify(self, hasher, encoded):
+        start = time.perf_counter()
+        hasher.verify('benchpass123', encoded)
+        return time.perf_counter() - start
+
+    def handle(self, *args, **options):
+        """Entrypoint for command"""
+        algorithms = options['hasher'] or [
+            hasher.algorithm for hasher in get_hashers()
+        ]
+        clients = ThreadPoolExecutor(max_workers=options['clients'])
+        try:
+            for algorithm in algorithms:
+                hasher = get_hasher(algorithm)
+                encoded = hasher.encode('benchpass123', hasher.salt())
+                self._verify(hasher, encoded)
+
+                start = time.perf_counter()
+                latencies = list(clients.map(
+                    lambda _: self._verify(hasher, encoded),
+                    range(options['logins']),
+                ))
+                elapsed = time.perf_counter() - start
+                self.stdout.write(
+                    f'{algorithm:<14} '
+                    f'p50 {percentile(latencies, 50) * 1000:8.1f} ms  '
+                    f'p95 {percentile(latencies, 95) * 1000:8.1f} ms  '
+                    f'{options["logins"] / elapsed:8.1f} logins/s'
+                )
+        finally:
+            clients.shutdown()
+            hashers.shutdown_executor()
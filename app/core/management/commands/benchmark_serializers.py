@@ -0,0 +1,72 @@
+"""
+Django command to compare recipe list serialization and rendering speed.
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory
+
+from core.models import Recipe
+from core.renderers import FastJSONRenderer
+from core.summary import with_current_summaries
+from recipe.serializers import RecipeSerializer, RecipeSummarySerializer
+
+
+class Command(BaseCommand):
+    """Django command to benchmark list serialization."""
+    help = ('Time serializing and rendering a page of recipes with model '
+            'instances or .values() rows, and the default or fast JSON '
+            'renderer.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--email', default='bench-0@example.com')
+        parser.add_argument('--rows', type=int, default=200)
+        parser.add_argument('--iterations', type=int, default=50)
+
+    def _time(self, options, build):
+        """Return the best wall time of build() over the iterations."""
+        best = float('inf')
+        for _ in range(options['iterations']):
+            start = time.perf_counter()
+            build()
+            best = min(best, time.perf_counter() - start)
+        return best
+
+    def handle(self, *args, **options):
+        """Entrypoint for command"""
+        recipes = Recipe.objects.filter(
+            user__email=options['email'],
+        ).order_by('-id')[:options['rows']]
+        instances = list(recipes.prefetch_related('tags', 'ingredients'))
+        rows = list(with_current_summaries(recipes).values(
+            *RecipeSummarySerializer.row_columns()
+        ))
+        if not rows:
+            raise CommandError(f"{options['email']} has no recipes.")
+        context = {'request': APIRequestFactory().get('/')}
+
+        def run(serializer_class, data, renderer):
+            return lambda: renderer.render(
+                serializer_class(data, many=True, context=context).data,
+            )
+
+        cases = [
+            ('nested serializer, JSONRenderer',
+             run(RecipeSerializer, instances, JSONRenderer())),
+            ('summary serializer, JSONRenderer',
+             run(RecipeSummarySerializer, instances, JSONRenderer())),
+            ('summary rows, JSONRenderer',
+             run(RecipeSummarySerializer, rows, JSONRenderer())),
+            ('summary rows, FastJSONRenderer',
+             run(RecipeSummarySerializer, rows, FastJSONRenderer())),
+        ]
+        baseline = None
+        for name, build in cases:
+            elapsed = self._time(options, build)
+            baseline = baseline or elapsed
+            self.stdout.write(
+                f'{name:<34} {elapsed * 1000:8.2f} ms  '
+                f'{len(rows) / elapsed:10.0f} rows/s  '
+                f'{baseline / elapsed:5.1f}x'
+            )
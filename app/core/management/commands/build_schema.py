@@ -0,0 +1,17 @@
+"""
+Django command to pre-build the cached OpenAPI schema.
+"""
+from django.core.management.base import BaseCommand
+
+from core.schema import build_schemas
+
+
+class Command(BaseCommand):
+    """Django command to build the API schema cache."""
+    help = ('Generate the OpenAPI schema for the current code version into '
+            'SCHEMA_CACHE_DIR, so no worker generates it on a request.')
+
+    def handle(self, *args, **options):
+        """Entrypoint for command"""
+        for path in build_schemas():
+            self.stdout.write(self.style.SUCCESS(f'Wrote {path}'))
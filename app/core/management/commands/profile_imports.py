@@ -0,0 +1,79 @@
+"""
+Django command to profile how long importing the app's entrypoint takes.
+"""
+import json
+import subprocess
+import sys
+from datetime import datetime, timezone
+
+from django.core.management.base import BaseCommand, CommandError
+
+from .benchmark_api import git_commit
+
+
+def parse_importtime(output):
+    """Return [(module, self_us, cumulative_us, depth)] from -X importtime."""
+    rows = []
+    for line in output.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        rows.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return rows
+
+
+class Command(BaseCommand):
+    """Django command to profile module import time."""
+    help = ('Import a module (app.wsgi by default) in a fresh interpreter '
+            'with -X importtime and report the total and the slowest '
+            'imports.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--module', default='app.wsgi')
+        parser.add_argument('--top', type=int, default=20,
+                            help='Number of slowest imports to list.')
+        parser.add_argument('--output', default=None,
+                            help='Write the full profile to this JSON file.')
+
+    def handle(self, *args, **options):
+        """Entrypoint for command"""
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c',
+             f'import {options["module"]}'],
+            capture_output=True, text=True,
+        )
+        rows = parse_importtime(result.stderr)
+        if result.returncode or not rows:
+            raise CommandError(
+                f'Importing {options["module"]} failed:\n{result.stderr}'
+            )
+
+        total = sum(row[1] for row in rows)
+        self.stdout.write(
+            f'Importing {options["module"]} took {total / 1000:.1f} ms '
+            f'({len(rows)} modules).'
+        )
+        self.stdout.write(f'{"cumulative":>12} {"self":>9}  module')
+        for name, self_us, cumulative_us, depth in sorted(
+            rows, key=lambda row: row[1], reverse=True,
+        )[:options['top']]:
+            self.stdout.write(
+                f'{cumulative_us / 1000:9.1f} ms {self_us / 1000:6.1f} ms  '
+                f'{name}'
+            )
+
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                json.dump({
+                    'module': options['module'],
+                    'commit': git_commit(),
+                    'created': datetime.now(timezone.utc).isoformat(),
+                    'total_ms': round(total / 1000, 3),
+                    'imports': [
+                        {'module': name, 'self_ms': self_us / 1000,
+                         'cumulative_ms': cumulative_us / 1000,
+                         'depth': depth}
+                        for name, self_us, cumulative_us, depth in rows
+                    ],
+                }, output, indent=2)
@@ -0,0 +1,58 @@
+"""
+Django command to rebuild or verify the stored recipe summaries.
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import Recipe
+from core.summary import stale_summaries, update_summaries
+
+
+class Command(BaseCommand):
+    """Django command to rebuild or verify recipe summaries."""
+    help = ('Recompute the tag/ingredient summary stored on each recipe, '
+            'or with --verify report recipes whose summary is stale.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--verify', action='store_true',
+            help='Only check the summaries; exit with an error if any is '
+                 'missing or stale.',
+        )
+        parser.add_argument('--user', help='Limit to this user\'s email.')
+        parser.add_argument(
+            '--batch-size', type=int, default=5000,
+            help='Recipes updated per UPDATE statement.',
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command"""
+        recipes = Recipe.objects.all()
+        if options['user']:
+            recipes = recipes.filter(user__email=options['user'])
+
+        if options['verify']:
+            stale = list(
+                stale_summaries(recipes).values_list('id', flat=True)
+            )
+            if stale:
+                raise CommandError(
+                    f'{len(stale)} recipes have stale summaries, e.g. '
+                    f'{stale[:10]}; run rebuild_summaries.'
+                )
+            self.stdout.write(self.style.SUCCESS('All summaries are current.'))
+            return
+
+        # Walk the primary key in batches to keep each UPDATE short.
+        ids = recipes.order_by('id').values_list('id', flat=True)
+        last_id, total = 0, 0
+        while True:
+            batch = list(ids.filter(id__gt=last_id)[:options['batch_size']])
+            if not batch:
+                break
+            total += update_summaries(
+                recipes.filter(id__gte=batch[0], id__lte=batch[-1])
+            )
+            last_id = batch[-1]
+        self.stdout.write(self.style.SUCCESS(
+            f'Rebuilt the summaries of {total} recipes.'
+        ))
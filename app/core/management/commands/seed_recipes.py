@@ -0,0 +1,119 @@
+"""
+Django command to seed users, recipes, tags and ingredients for load tests.
+"""
+import random
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core.models import Recipe, Tag, Ingredient
+from core.search import update_search_vectors
+from core.summary import update_summaries
+
+BATCH_SIZE = 2000
+
+
+class Command(BaseCommand):
+    """Django command to seed benchmark data."""
+    help = 'Seed realistic volumes of users, recipes, tags and ingredients.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10)
+        parser.add_argument(
+            '--recipes', type=int, default=1000,
+            help='Mean number of recipes per user.',
+        )
+        parser.add_argument(
+            '--distribution', choices=['uniform', 'zipf'], default='zipf',
+            help='How recipes are spread over users; zipf gives a few '
+                 'heavy users and a long tail.',
+        )
+        parser.add_argument('--tags', type=int, default=50,
+                            help='Tags per user.')
+        parser.add_argument('--ingredients', type=int, default=200,
+                            help='Ingredients per user.')
+        parser.add_argument('--tags-per-recipe', type=int, default=3)
+        parser.add_argument('--ingredients-per-recipe', type=int, default=8)
+        parser.add_argument('--email-prefix', default='bench')
+        parser.add_argument('--password', default='benchpass123')
+        parser.add_argument('--seed', type=int, default=0)
+
+    def _recipe_counts(self, options, rng):
+        """Return the number of recipes to create for each user."""
+        users, mean = options['users'], options['recipes']
+        if options['distribution'] == 'uniform':
+            return [mean] * users
+        weights = [1 / rank for rank in range(1, users + 1)]
+        scale = mean * users / sum(weights)
+        return [max(1, round(w * scale)) for w in weights]
+
+    def _bulk_link(self, field, links):
+        """Bulk insert (recipe_id, object_id) pairs into a through table."""
+        m2m_field = Recipe._meta.get_field(field)
+        through = m2m_field.remote_field.through
+        target = f'{m2m_field.m2m_reverse_field_name()}_id'
+        through.objects.bulk_create(
+            [through(recipe_id=recipe_id, **{target: obj_id})
+             for recipe_id, obj_id in links],
+            batch_size=BATCH_SIZE,
+        )
+
+    @transaction.atomic
+    def _seed_user(self, email, password_hash, count, options, rng):
+        """Create one user with their tags, ingredients and recipes."""
+        user = get_user_model().objects.create(
+            email=email, name=email.split('@')[0], password=password_hash,
+        )
+        tags = Tag.objects.bulk_create(
+            [Tag(user=user, name=f'Tag {i}') for i in range(options['tags'])],
+            batch_size=BATCH_SIZE,
+        )
+        ingredients = Ingredient.objects.bulk_create(
+            [Ingredient(user=user, name=f'Ingredient {i}')
+             for i in range(options['ingredients'])],
+            batch_size=BATCH_SIZE,
+        )
+        recipes = Recipe.objects.bulk_create(
+            [Recipe(
+                user=user,
+                title=f'Recipe {i}',
+                description=f'Seeded recipe {i} for {email}.',
+                time_minutes=rng.randint(5, 180),
+                price=Decimal(rng.randint(100, 99999)) / 100,
+                link=f'https://example.com/recipes/{i}',
+            ) for i in range(count)],
+            batch_size=BATCH_SIZE,
+        )
+        for field, objects, per_recipe in (
+            ('tags', tags, options['tags_per_recipe']),
+            ('ingredients', ingredients, options['ingredients_per_recipe']),
+        ):
+            per_recipe = min(per_recipe, len(objects))
+            self._bulk_link(field, [
+                (recipe.id, obj.id)
+                for recipe in recipes
+                for obj in rng.sample(objects, per_recipe)
+            ])
+        update_search_vectors(Recipe.objects.filter(user=user))
+        update_summaries(Recipe.objects.filter(user=user))
+        return len(recipes)
+
+    def handle(self, *args, **options):
+        """Entrypoint for command"""
+        rng = random.Random(options['seed'])
+        password_hash = make_password(options['password'])
+        existing = get_user_model().objects.filter(
+            email__startswith=f"{options['email_prefix']}-",
+        ).count()
+        total = 0
+        for i, count in enumerate(self._recipe_counts(options, rng)):
+            email = f"{options['email_prefix']}-{existing + i}@example.com"
+            total += self._seed_user(email, password_hash, count, options, rng)
+            self.stdout.write(f'Seeded {email} with {count} recipes.')
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Seeded {options['users']} users and {total} recipes."
+        ))
@@ -1,8 +1,11 @@
 """
     Django command to wait for the database to be available.
 """
-from django.core.management.base import BaseCommand
+import socket
 import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
 from django.db.utils import OperationalError
 from psycopg2 import OperationalError as Psycopg2OpError
 
@@ -10,17 +13,51 @@ from psycopg2 import OperationalError as Psycopg2OpError
 class Command(BaseCommand):
     """Django command to wait for database."""
 
-    def handle(self, *args, **kwargs):
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--timeout', type=float, default=60,
+            help='Give up after this many seconds.',
+        )
+        parser.add_argument(
+            '--interval', type=float, default=0.1,
+            help='First wait between attempts; doubled after each one.',
+        )
+        parser.add_argument(
+            '--max-interval', type=float, default=2,
+            help='Longest wait between attempts.',
+        )
+
+    def ping(self, alias='default'):
+        """Raise unless the database accepts a connection."""
+        connection = connections[alias]
+        host = connection.settings_dict['HOST']
+        if host and not host.startswith('/'):
+            # A bare TCP connect fails fast while the server isn't
+            # listening yet, without going through libpq.
+            port = int(connection.settings_dict['PORT'] or 5432)
+            socket.create_connection((host, port), timeout=1).close()
+        connection.ensure_connection()
+        connection.close()
+
+    def handle(self, *args, **options):
         """Entrypoint for command"""
         self.stdout.write('Waiting for database...')
-        db_up = False
-        while db_up is False:
+        deadline = time.monotonic() + options['timeout']
+        interval = options['interval']
+        while True:
             try:
-                self.check(databases=["default"])
-                db_up = True
-            except (Psycopg2OpError, OperationalError):
-                self.stdout.write("Database is unavailable,"
-                                  " waiting 1 second...")
-                time.sleep(1)
+                self.ping()
+                break
+            except (OSError, Psycopg2OpError, OperationalError) as exc:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise CommandError(
+                        f'Database still unavailable after '
+                        f'{options["timeout"]:g} seconds: {exc}'
+                    )
+                self.stdout.write(f'Database is unavailable, waiting '
+                                  f'{interval:g} seconds...')
+                time.sleep(min(interval, remaining))
+                interval = min(interval * 2, options['max_interval'])
 
         self.stdout.write(self.style.SUCCESS('Database is available!'))
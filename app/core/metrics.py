@@ -0,0 +1,187 @@
+"""
+Prometheus metrics for requests and database usage.
+"""
+import hmac
+import json
+import logging
+import os
+import socket
+
+from django.conf import settings
+from django.http import Http404, HttpResponse, HttpResponseForbidden
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    REGISTRY,
+    generate_latest,
+)
+from prometheus_client import multiprocess
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+logger = logging.getLogger(__name__)
+
+REQUEST_LATENCY = Histogram(
+    'http_request_duration_seconds',
+    'Time spent handling a request.',
+    ['view', 'method', 'status'],
+)
+REQUEST_QUERIES = Histogram(
+    'http_request_db_queries',
+    'Database queries run while handling a request.',
+    ['view', 'method'],
+    buckets=(0, 1, 2, 3, 4, 6, 8, 12, 16, 25, 50, 100, float('inf')),
+)
+REQUEST_DB_TIME = Histogram(
+    'http_request_db_duration_seconds',
+    'Time spent in database queries while handling a request.',
+    ['view', 'method'],
+)
+RESPONSE_SIZE = Histogram(
+    'http_response_size_bytes',
+    'Size of non-streaming response bodies.',
+    ['view', 'method'],
+    buckets=(256, 1024, 4096, 16384, 65536, 262144, 1048576, float('inf')),
+)
+SLOW_QUERIES = Counter(
+    'db_slow_queries_total',
+    'Queries slower than SLOW_QUERY_THRESHOLD_MS.',
+    ['view'],
+)
+CONNECTIONS_CREATED = Counter(
+    'db_connections_created_total',
+    'New database connections opened.',
+)
+
+
+def get_registry():
+    """Return the registry to expose.
+
+    When PROMETHEUS_MULTIPROC_DIR is set, every uWSGI worker writes its
+    samples to files in that directory and they are summed at scrape time,
+    so any worker can answer for all of them.
+    """
+    if 'PROMETHEUS_MULTIPROC_DIR' not in os.environ:
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+def read_uwsgi_stats(address, timeout=1):
+    """Return the JSON document served by a uWSGI stats socket.
+
+    address is a unix socket path or host:port, as given to --stats.
+    """
+    host, _, port = address.rpartition(':')
+    if port.isdigit() and '/' not in address:
+        family, target = socket.AF_INET, (host or '127.0.0.1', int(port))
+    else:
+        family, target = socket.AF_UNIX, address
+    chunks = []
+    with socket.socket(family, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(target)
+        while True:
+            chunk = sock.recv(65536)
+            if not chunk:
+                break
+            chunks.append(chunk)
+    return json.loads(b''.join(chunks))
+
+
+class UwsgiStatsCollector:
+    """Expose the uWSGI master's stats as Prometheus metrics."""
+
+    def __init__(self, address):
+        self.address = address
+
+    def collect(self):
+        up = GaugeMetricFamily(
+            'uwsgi_stats_up', 'Whether the uWSGI stats socket answered.',
+        )
+        try:
+            stats = read_uwsgi_stats(self.address)
+        except (OSError, ValueError):
+            logger.warning('Could not read uWSGI stats from %s',
+                           self.address, exc_info=True)
+            up.add_metric([], 0)
+            yield up
+            return
+        up.add_metric([], 1)
+        yield up
+
+        yield GaugeMetricFamily(
+            'uwsgi_listen_queue',
+            'Connections waiting in the listen queue.',
+            value=stats.get('listen_queue', 0),
+        )
+        yield CounterMetricFamily(
+            'uwsgi_listen_queue_errors',
+            'Connections refused because the listen queue was full.',
+            value=stats.get('listen_queue_errors', 0),
+        )
+
+        workers = stats.get('workers', [])
+        statuses = {}
+        for worker in workers:
+            statuses[worker['status']] = statuses.get(worker['status'], 0) + 1
+        by_status = GaugeMetricFamily(
+            'uwsgi_workers', 'Worker processes by status.', labels=['status'],
+        )
+        for status, count in sorted(statuses.items()):
+            by_status.add_metric([status], count)
+        yield by_status
+        yield GaugeMetricFamily(
+            'uwsgi_busy_threads', 'Worker threads handling a request.',
+            value=sum(
+                core.get('in_request', 0)
+                for worker in workers for core in worker.get('cores', [])
+            ),
+        )
+
+        per_worker = [
+            (CounterMetricFamily, 'uwsgi_worker_requests',
+             'Requests handled by the worker.', 'requests', 1),
+            (CounterMetricFamily, 'uwsgi_worker_exceptions',
+             'Exceptions raised in the worker.', 'exceptions', 1),
+            (CounterMetricFamily, 'uwsgi_worker_harakiri',
+             'Requests the worker was killed for by harakiri.',
+             'harakiri_count', 1),
+            (CounterMetricFamily, 'uwsgi_worker_respawns',
+             'Times the worker slot was respawned.', 'respawn_count', 1),
+            (GaugeMetricFamily, 'uwsgi_worker_rss_bytes',
+             'Resident memory of the worker (needs --memory-report).',
+             'rss', 1),
+            (GaugeMetricFamily, 'uwsgi_worker_avg_response_seconds',
+             'Average response time of the worker.', 'avg_rt', 1e6),
+        ]
+        for family_class, name, documentation, key, per_unit in per_worker:
+            family = family_class(name, documentation, labels=['worker'])
+            # Cheap (not yet spawned) workers report id 0, so label by slot.
+            for slot, worker in enumerate(workers, 1):
+                family.add_metric([str(slot)], worker.get(key, 0) / per_unit)
+            yield family
+
+
+def metrics_view(request):
+    """Serve metrics in the Prometheus text format.
+
+    Requires METRICS_AUTH_TOKEN as a bearer token; without one configured
+    the endpoint only exists with DEBUG.
+    """
+    token = settings.METRICS_AUTH_TOKEN
+    if not token and not settings.DEBUG:
+        raise Http404
+    if token and not hmac.compare_digest(
+        request.META.get('HTTP_AUTHORIZATION', ''), f'Bearer {token}',
+    ):
+        return HttpResponseForbidden()
+    output = generate_latest(get_registry())
+    if settings.UWSGI_STATS:
+        # Read once per scrape, by whichever worker answers it.
+        registry = CollectorRegistry()
+        registry.register(UwsgiStatsCollector(settings.UWSGI_STATS))
+        output += generate_latest(registry)
+    return HttpResponse(output, content_type=CONTENT_TYPE_LATEST)
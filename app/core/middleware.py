@@ -0,0 +1,119 @@
+"""
+Request instrumentation middleware.
+"""
+import asyncio
+import logging
+import time
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.db import connections
+
+from . import metrics
+
+logger = logging.getLogger('core.slow_queries')
+
+
+class QueryRecorder:
+    """Database execute wrapper timing every query of a request."""
+
+    def __init__(self, request):
+        self.request = request
+        self.active = False
+        self.count = 0
+        self.duration = 0.0
+
+    @property
+    def view(self):
+        match = self.request.resolver_match
+        return match.view_name if match else '<unresolved>'
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.count += 1
+            self.duration += elapsed
+            threshold = settings.SLOW_QUERY_THRESHOLD_MS
+            if threshold is not None and elapsed * 1000 >= threshold:
+                metrics.SLOW_QUERIES.labels(self.view).inc()
+                # sql holds placeholders only; the parameters can carry
+                # token keys, password hashes and emails.
+                if settings.DEBUG and settings.SLOW_QUERY_LOG_PARAMS:
+                    logger.warning(
+                        'Slow query (%.1f ms) in %s: %s; params=%r',
+                        elapsed * 1000, self.view, sql, params,
+                    )
+                else:
+                    logger.warning(
+                        'Slow query (%.1f ms) in %s: %s',
+                        elapsed * 1000, self.view, sql,
+                    )
+
+
+@contextmanager
+def record_queries(request):
+    """Record the queries this thread runs for request."""
+    recorder = getattr(request, '_query_recorder', None)
+    if recorder is None:
+        yield
+        return
+    recorder.active = True
+    with ExitStack() as stack:
+        for conn in connections.all():
+            stack.enter_context(conn.execute_wrapper(recorder))
+        yield
+
+
+class MetricsMiddleware:
+    """Record latency, queries, DB time and response size per view.
+
+    Under ASGI only queries run through core.async_views are counted, as
+    sync views share a thread with other requests.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            # Mark the instance as a coroutine function, as Django's
+            # MiddlewareMixin does.
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self):
+            return self.__acall__(request)
+        request._query_recorder = QueryRecorder(request)
+        start = time.perf_counter()
+        with record_queries(request):
+            response = self.get_response(request)
+        self._observe(request, response, time.perf_counter() - start)
+        return response
+
+    async def __acall__(self, request):
+        request._query_recorder = QueryRecorder(request)
+        start = time.perf_counter()
+        response = await self.get_response(request)
+        self._observe(request, response, time.perf_counter() - start)
+        return response
+
+    def _observe(self, request, response, elapsed):
+        recorder = request._query_recorder
+        view, method = recorder.view, request.method
+        metrics.REQUEST_LATENCY.labels(
+            view, method, response.status_code,
+        ).observe(elapsed)
+        if recorder.active:
+            metrics.REQUEST_QUERIES.labels(view, method).observe(
+                recorder.count
+            )
+            metrics.REQUEST_DB_TIME.labels(view, method).observe(
+                recorder.duration
+            )
+        if not response.streaming:
+            metrics.RESPONSE_SIZE.labels(view, method).observe(
+                len(response.content)
+            )
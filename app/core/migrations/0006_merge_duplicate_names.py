@@ -0,0 +1,42 @@
+# Generated by Django 3.2.25 on 2026-10-18 03:01
+
+from django.db import migrations
+from django.db.models import Count, Min
+
+
+def merge_duplicate_names(apps, schema_editor):
+    """Merge tags/ingredients sharing (user, name) into the oldest row."""
+    Recipe = apps.get_model('core', 'Recipe')
+    for model_name, field in (('Tag', 'tags'), ('Ingredient', 'ingredients')):
+        model = apps.get_model('core', model_name)
+        through = getattr(Recipe, field).through
+        target = f'{model_name.lower()}_id'
+        duplicates = (
+            model.objects.values('user', 'name')
+            .annotate(keep_id=Min('id'), total=Count('id'))
+            .filter(total__gt=1)
+        )
+        for dup in duplicates:
+            others = model.objects.filter(
+                user=dup['user'], name=dup['name'],
+            ).exclude(id=dup['keep_id'])
+            recipe_ids = through.objects.filter(
+                **{f'{target}__in': others},
+            ).values_list('recipe_id', flat=True)
+            through.objects.bulk_create(
+                [through(recipe_id=recipe_id, **{target: dup['keep_id']})
+                 for recipe_id in set(recipe_ids)],
+                ignore_conflicts=True,
+            )
+            others.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_recipe_image'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_names, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 3.2.25 on 2026-10-18 03:09
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+from django.db.models import OuterRef, Subquery, TextField, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_search_vectors(apps, schema_editor):
+    """Compute search vectors for existing recipes."""
+    # A frozen copy of core.search.update_search_vectors, so later changes
+    # to it don't alter what this migration does.
+    Recipe = apps.get_model('core', 'Recipe')
+    ingredient_names = Subquery(
+        Recipe.ingredients.through.objects.filter(recipe_id=OuterRef('pk'))
+        .values('recipe_id')
+        .annotate(names=StringAgg('ingredient__name', ' '))
+        .values('names'),
+        output_field=TextField(),
+    )
+    Recipe.objects.update(search_vector=(
+        SearchVector('title', weight='A', config='english')
+        + SearchVector('description', weight='B', config='english')
+        + SearchVector(
+            Coalesce(ingredient_names, Value(''), output_field=TextField()),
+            weight='C', config='english',
+        )
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_recipe_image_renditions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(
+            backfill_search_vectors, migrations.RunPython.noop,
+        ),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='recipe_search_vector_idx'),
+        ),
+    ]
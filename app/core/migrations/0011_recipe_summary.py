@@ -0,0 +1,50 @@
+# Generated by Django 3.2.25 on 2026-10-18 03:26
+
+from django.contrib.postgres.aggregates import JSONBAgg
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, JSONObject
+
+
+def backfill_summaries(apps, schema_editor):
+    """Compute summaries for existing recipes."""
+    # A frozen copy of core.summary.update_summaries, so later changes to
+    # it don't alter what this migration does.
+    Recipe = apps.get_model('core', 'Recipe')
+
+    def related_items(field, target):
+        items = Subquery(
+            getattr(Recipe, field).through.objects
+            .filter(recipe_id=OuterRef('pk'))
+            .values('recipe_id')
+            .annotate(items=JSONBAgg(
+                JSONObject(id=f'{target}_id', name=f'{target}__name'),
+                ordering=f'{target}_id',
+            ))
+            .values('items'),
+            output_field=models.JSONField(),
+        )
+        return Coalesce(items, Value('[]'), output_field=models.JSONField())
+
+    Recipe.objects.update(summary=JSONObject(
+        tags=related_items('tags', 'tag'),
+        ingredients=related_items('ingredients', 'ingredient'),
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_recipe_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='summary',
+            field=models.JSONField(editable=False, null=True),
+        ),
+        migrations.RunPython(
+            backfill_summaries, migrations.RunPython.noop,
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.25 on 2026-10-18 04:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_recipe_summary'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='user',
+            name='data_version',
+            field=models.PositiveBigIntegerField(default=0, editable=False),
+        ),
+    ]
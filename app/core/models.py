@@ -1,3 +1,5 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 from django.contrib.auth.models import (PermissionsMixin,
                                         AbstractBaseUser,
@@ -42,10 +44,31 @@ class User(AbstractBaseUser, PermissionsMixin):
     name = models.CharField(max_length=255)
     is_active = models.BooleanField(default=True)
     is_staff = models.BooleanField(default=False)
+    # Bumped on every write to the user's recipes, tags or ingredients;
+    # used to build ETags and cache keys for their API responses. Only
+    # recipe.caching.bump_user_version writes it, see save().
+    data_version = models.PositiveBigIntegerField(default=0, editable=False)
 
     USERNAME_FIELD = 'email'
     objects = CustomUserManager()
 
+    def save(self, *args, **kwargs):
+        """Save the user, leaving data_version out of full saves.
+
+        Writing back the version loaded into memory would undo a bump made
+        meanwhile, and stale ETags would keep matching.
+        """
+        if (not args and not self._state.adding
+                and not kwargs.get('force_insert')
+                and kwargs.get('update_fields') is None):
+            deferred = self.get_deferred_fields()
+            kwargs['update_fields'] = [
+                field.attname for field in self._meta.concrete_fields
+                if not field.primary_key and field.attname not in deferred
+                and field.attname != 'data_version'
+            ]
+        super().save(*args, **kwargs)
+
 
 class Recipe(models.Model):
     user = models.ForeignKey(
@@ -61,6 +84,27 @@ class Recipe(models.Model):
     tags = models.ManyToManyField('Tag')
     ingredients = models.ManyToManyField('Ingredient')
     image = models.ImageField(null=True, upload_to=recipe_image_file_path)
+    # Storage paths of resized copies of image, filled in the background by
+    # recipe.images.generate_renditions: {size: {format: path}}.
+    image_renditions = models.JSONField(default=dict, blank=True)
+    # Weighted title/description/ingredient lexemes, maintained by
+    # core.search.update_search_vectors.
+    search_vector = SearchVectorField(null=True, editable=False)
+    # Rendered {'tags': [{id, name}], 'ingredients': [...]} served by the
+    # list endpoint, maintained by core.summary.update_summaries.
+    summary = models.JSONField(null=True, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['user', '-id'],
+                name='recipe_user_newest_idx',
+            ),
+            GinIndex(
+                fields=['search_vector'],
+                name='recipe_search_vector_idx',
+            ),
+        ]
 
     def __str__(self) -> str:
         return self.title
@@ -74,6 +118,14 @@ class Tag(models.Model):
         on_delete=models.CASCADE,
     )
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'name'],
+                name='tag_user_name_unique',
+            ),
+        ]
+
     def __str__(self):
         return self.name
 
@@ -86,5 +138,13 @@ class Ingredient(models.Model):
         on_delete=models.CASCADE,
     )
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'name'],
+                name='ingredient_user_name_unique',
+            ),
+        ]
+
     def __str__(self):
         return self.name
@@ -0,0 +1,43 @@
+"""
+Fast JSON renderer built on orjson.
+"""
+import decimal
+
+import orjson
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+_fallback_encoder = JSONEncoder()
+
+
+def _default(obj):
+    """Encode the types orjson does not handle natively."""
+    if isinstance(obj, decimal.Decimal):
+        # Exact, and matching how DecimalField renders with the default
+        # COERCE_DECIMAL_TO_STRING; a float could change the value.
+        return str(obj)
+    return _fallback_encoder.default(obj)
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSONRenderer producing the same compact UTF-8 output via orjson.
+
+    Indented output, as asked for by the browsable API or an
+    ``indent`` media type parameter, is left to JSONRenderer.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if indent is not None or self.ensure_ascii or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        ret = orjson.dumps(data, default=_default, option=(
+            orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+        ))
+        # Keep JSONRenderer's escaping of the JavaScript line terminators.
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028')
+            ret = ret.replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
@@ -0,0 +1,158 @@
+"""
+OpenAPI schema generated once per code version and served from cache.
+"""
+import functools
+import gzip
+import hashlib
+import logging
+import os
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+
+import django
+import drf_spectacular
+import rest_framework
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils import translation
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from drf_spectacular.utils import extend_schema
+from drf_spectacular.views import SCHEMA_KWARGS, SpectacularAPIView
+
+logger = logging.getLogger(__name__)
+
+_cache = {}
+_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class CachedSchema:
+    """A rendered schema document and its gzipped copy."""
+    content: bytes
+    gzipped: bytes
+    etag: str
+
+
+@functools.lru_cache(maxsize=None)
+def code_version():
+    """Return a digest of everything the generated schema depends on.
+
+    Covers the project's Python sources, the versions of the libraries
+    generating the schema and SPECTACULAR_SETTINGS, so a deploy that
+    changes any of them gets a new schema without clearing caches.
+    """
+    digest = hashlib.sha256()
+    for library in (django, rest_framework, drf_spectacular):
+        digest.update(f'{library.__name__}=={library.__version__}\n'.encode())
+    digest.update(repr(sorted(settings.SPECTACULAR_SETTINGS.items())).encode())
+    base_dir = Path(settings.BASE_DIR)
+    for path in sorted(base_dir.rglob('*.py')):
+        digest.update(str(path.relative_to(base_dir)).encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+def _disk_path(renderer, lang):
+    """Return where the schema for renderer and lang is cached on disk."""
+    name = f'schema-{code_version()}-{lang or "default"}.{renderer.format}'
+    return os.path.join(settings.SCHEMA_CACHE_DIR, name)
+
+
+def _read_disk(path):
+    try:
+        with open(path, 'rb') as content, open(f'{path}.gz', 'rb') as gz:
+            return content.read(), gz.read()
+    except FileNotFoundError:
+        return None
+
+
+def _write_disk(path, content, gzipped):
+    """Write the files atomically; failing only costs a rebuild."""
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        for target, data in ((path, content), (f'{path}.gz', gzipped)):
+            temporary = f'{target}.{os.getpid()}.tmp'
+            with open(temporary, 'wb') as file:
+                file.write(data)
+            os.replace(temporary, target)
+    except OSError:
+        logger.warning('Could not cache the API schema in %s', path,
+                       exc_info=True)
+
+
+def _generate(renderer, lang):
+    """Generate and render the public schema."""
+    view = SpectacularAPIView
+    generator = view.generator_class(
+        urlconf=view.urlconf, api_version=view.api_version,
+    )
+    with translation.override(lang or settings.LANGUAGE_CODE):
+        schema = generator.get_schema(request=None, public=True)
+        return renderer.render(schema, renderer.media_type, {})
+
+
+def get_schema(renderer, lang=None):
+    """Return the CachedSchema rendered by renderer, building it once.
+
+    Looks in this process first, then in SCHEMA_CACHE_DIR (shared by the
+    workers and filled by the build_schema command at startup), and only
+    then generates the schema.
+    """
+    key = (code_version(), renderer.format, lang)
+    schema = _cache.get(key)
+    if schema is not None:
+        return schema
+    with _lock:
+        if key not in _cache:
+            path = _disk_path(renderer, lang)
+            stored = _read_disk(path)
+            if stored is None:
+                content = _generate(renderer, lang)
+                stored = content, gzip.compress(content, mtime=0)
+                _write_disk(path, *stored)
+            _cache[key] = CachedSchema(
+                *stored, etag=hashlib.sha256(stored[0]).hexdigest()[:32],
+            )
+        return _cache[key]
+
+
+def build_schemas():
+    """Build and store the schema in every format served; return paths."""
+    renderers = {}
+    for renderer_class in SpectacularAPIView.renderer_classes:
+        renderers.setdefault(renderer_class.format, renderer_class())
+    paths = []
+    for renderer in renderers.values():
+        get_schema(renderer)
+        paths.append(_disk_path(renderer, None))
+    return paths
+
+
+class CachedSpectacularAPIView(SpectacularAPIView):
+    """SpectacularAPIView serving the cached schema with ETag and gzip."""
+
+    @extend_schema(**SCHEMA_KWARGS)
+    def get(self, request, *args, **kwargs):
+        lang = request.GET.get('lang')
+        if not settings.USE_I18N or lang not in dict(settings.LANGUAGES):
+            lang = None
+        schema = get_schema(request.accepted_renderer, lang)
+
+        gzipped = 'gzip' in request.META.get('HTTP_ACCEPT_ENCODING', '')
+        etag = f'"{schema.etag}-gzip"' if gzipped else f'"{schema.etag}"'
+        if etag in request.META.get('HTTP_IF_NONE_MATCH', ''):
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponse(
+                schema.gzipped if gzipped else schema.content,
+                content_type=request.accepted_media_type,
+            )
+            if gzipped:
+                response['Content-Encoding'] = 'gzip'
+        response['ETag'] = etag
+        patch_vary_headers(response, ('Accept', 'Accept-Encoding'))
+        patch_cache_control(
+            response, public=True, max_age=settings.SCHEMA_CACHE_MAX_AGE,
+        )
+        return response
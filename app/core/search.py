@@ -0,0 +1,79 @@
+"""
+Full-text search vectors for recipes.
+"""
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.search import SearchVector
+from django.db.models import OuterRef, Subquery, TextField, Value
+from django.db.models.functions import Coalesce
+
+SEARCH_CONFIG = 'english'
+
+
+def update_search_vectors(queryset):
+    """Recompute search_vector for every recipe in queryset.
+
+    Runs as a single UPDATE, aggregating ingredient names in a correlated
+    subquery, so it is cheap for one recipe and still one statement for
+    all recipes sharing a renamed ingredient.
+    """
+    through = queryset.model.ingredients.through
+    ingredient_names = Subquery(
+        through.objects.filter(recipe_id=OuterRef('pk'))
+        .values('recipe_id')
+        .annotate(names=StringAgg('ingredient__name', ' '))
+        .values('names'),
+        output_field=TextField(),
+    )
+    return queryset.update(search_vector=(
+        SearchVector('title', weight='A', config=SEARCH_CONFIG)
+        + SearchVector('description', weight='B', config=SEARCH_CONFIG)
+        + SearchVector(
+            Coalesce(ingredient_names, Value(''), output_field=TextField()),
+            weight='C', config=SEARCH_CONFIG,
+        )
+    ))
+
+
+def update_on_recipe_save(sender, instance, update_fields=None, **kwargs):
+    """Signal handler refreshing the vector of a saved recipe."""
+    if update_fields and not {'title', 'description'} & set(update_fields):
+        return
+    update_search_vectors(sender.objects.filter(pk=instance.pk))
+
+
+def update_on_ingredient_save(sender, instance, created, **kwargs):
+    """Signal handler refreshing recipes using a renamed ingredient."""
+    if not created:
+        recipes = instance.recipe_set.model.objects
+        update_search_vectors(recipes.filter(ingredients=instance))
+
+
+def remember_ingredient_recipes(sender, instance, **kwargs):
+    """Signal handler noting an ingredient's recipes before unlinking."""
+    instance._search_recipe_ids = list(
+        instance.recipe_set.values_list('id', flat=True)
+    )
+
+
+def update_on_ingredient_delete(sender, instance, **kwargs):
+    """Signal handler refreshing the recipes of a deleted ingredient."""
+    recipes = instance.recipe_set.model.objects
+    update_search_vectors(
+        recipes.filter(pk__in=instance._search_recipe_ids)
+    )
+
+
+def update_on_ingredients_changed(sender, instance, action, reverse,
+                                  model, pk_set, **kwargs):
+    """Signal handler refreshing recipes whose ingredients changed."""
+    if reverse and action == 'pre_clear':
+        remember_ingredient_recipes(sender, instance)
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        recipes = type(instance).objects.filter(pk=instance.pk)
+    elif action == 'post_clear':
+        recipes = model.objects.filter(pk__in=instance._search_recipe_ids)
+    else:
+        recipes = model.objects.filter(pk__in=pk_set)
+    update_search_vectors(recipes)
@@ -0,0 +1,47 @@
+"""
+Static files storage writing content-hashed, precompressed files.
+"""
+import gzip
+import os
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Manifest storage that also writes a .gz beside each text file.
+
+    nginx serves the .gz directly (gzip_static), so assets are compressed
+    once at collectstatic time rather than on every request.
+    """
+    compress_extensions = (
+        '.css', '.js', '.map', '.json', '.svg', '.txt', '.html', '.xml',
+        '.eot', '.otf', '.ttf', '.ico',
+    )
+    # Skip files gzip barely shrinks; the extra file would not pay off.
+    min_compression_ratio = 0.95
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        # Earlier passes may yield intermediate names that were replaced,
+        # so compress the final names recorded for the manifest.
+        for name, hashed_name in self.hashed_files.items():
+            self.compress(name)
+            self.compress(hashed_name)
+
+    def compress(self, name):
+        """Write name.gz if name is compressible text; return whether."""
+        if os.path.splitext(name)[1].lower() not in self.compress_extensions:
+            return False
+        with self.open(name) as original:
+            content = original.read()
+        compressed = gzip.compress(content, compresslevel=9, mtime=0)
+        if len(compressed) > len(content) * self.min_compression_ratio:
+            return False
+        gzipped_name = f'{name}.gz'
+        if self.exists(gzipped_name):
+            self.delete(gzipped_name)
+        self._save(gzipped_name, ContentFile(compressed))
+        return True
@@ -0,0 +1,107 @@
+"""
+Denormalized tag/ingredient summaries of recipes.
+"""
+from django.contrib.postgres.aggregates import JSONBAgg
+from django.db.models import F, JSONField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, JSONObject
+
+SUMMARY_FIELDS = ('tags', 'ingredients')
+
+
+def empty_summary():
+    """Return the summary of a recipe without tags or ingredients."""
+    return {field: [] for field in SUMMARY_FIELDS}
+
+
+def _related_items(model, field):
+    """Return a subquery of [{id, name}, ...] linked to OuterRef('pk')."""
+    m2m_field = model._meta.get_field(field)
+    through = m2m_field.remote_field.through
+    target = m2m_field.m2m_reverse_field_name()
+    items = Subquery(
+        through.objects.filter(recipe_id=OuterRef('pk'))
+        .values('recipe_id')
+        .annotate(items=JSONBAgg(
+            JSONObject(id=f'{target}_id', name=f'{target}__name'),
+            ordering=f'{target}_id',
+        ))
+        .values('items'),
+        output_field=JSONField(),
+    )
+    return Coalesce(items, Value('[]'), output_field=JSONField())
+
+
+def summary_expression(model):
+    """Return an expression computing the summary of each recipe row."""
+    return JSONObject(**{
+        field: _related_items(model, field) for field in SUMMARY_FIELDS
+    })
+
+
+def update_summaries(queryset):
+    """Recompute summary for every recipe in queryset in one UPDATE."""
+    return queryset.update(summary=summary_expression(queryset.model))
+
+
+def with_current_summaries(queryset):
+    """Annotate current_summary, computing it where summary is NULL.
+
+    PostgreSQL only evaluates the summary subqueries for rows without a
+    stored summary, so a page of recipes stays a single query.
+    """
+    return queryset.annotate(current_summary=Coalesce(
+        'summary', summary_expression(queryset.model),
+        output_field=JSONField(),
+    ))
+
+
+def stale_summaries(queryset):
+    """Return the recipes of queryset whose summary is missing or stale."""
+    return queryset.alias(
+        expected_summary=summary_expression(queryset.model),
+    ).exclude(summary=F('expected_summary'))
+
+
+def set_empty_summary(sender, instance, raw=False, **kwargs):
+    """Signal handler giving new recipes an empty summary."""
+    if not raw and instance._state.adding and instance.summary is None:
+        instance.summary = empty_summary()
+
+
+def update_on_rename(sender, instance, created, update_fields=None,
+                     **kwargs):
+    """Signal handler refreshing recipes using a renamed tag/ingredient."""
+    if created or (update_fields and 'name' not in update_fields):
+        return
+    update_summaries(instance.recipe_set.model.objects.filter(
+        pk__in=instance.recipe_set.values('pk'),
+    ))
+
+
+def remember_recipes(sender, instance, **kwargs):
+    """Signal handler noting a tag/ingredient's recipes before unlinking."""
+    instance._summary_recipe_ids = list(
+        instance.recipe_set.values_list('id', flat=True)
+    )
+
+
+def update_on_delete(sender, instance, **kwargs):
+    """Signal handler refreshing the recipes of a deleted tag/ingredient."""
+    recipes = instance.recipe_set.model.objects
+    update_summaries(recipes.filter(pk__in=instance._summary_recipe_ids))
+
+
+def update_on_links_changed(sender, instance, action, reverse, model,
+                            pk_set, **kwargs):
+    """Signal handler refreshing recipes whose tags/ingredients changed."""
+    if reverse and action == 'pre_clear':
+        remember_recipes(sender, instance)
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        recipes = type(instance).objects.filter(pk=instance.pk)
+    elif action == 'post_clear':
+        recipes = model.objects.filter(pk__in=instance._summary_recipe_ids)
+    else:
+        recipes = model.objects.filter(pk__in=pk_set)
+    update_summaries(recipes)
@@ -2,12 +2,16 @@
 Test for Django admin modifications.
 """
 
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.contrib.auth import get_user_model
 from django.test import Client
 from django.urls import reverse
 
 
+# The manifest only exists after collectstatic.
+@override_settings(
+    STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage'
+)
 class AdminSiteTests(TestCase):
 
     def setUp(self) -> None:
@@ -0,0 +1,94 @@
+"""
+Tests for running views from async code.
+"""
+import asyncio
+import threading
+import time
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.http import HttpResponse
+from django.test import TransactionTestCase, override_settings
+from prometheus_client import REGISTRY
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from core import async_views
+from core.middleware import MetricsMiddleware
+from core.models import Recipe
+from recipe.views import RecipeViewSet
+
+
+@override_settings(ASYNC_VIEW_THREADS=2)
+class AsyncViewTests(TransactionTestCase):
+    """Test async_view."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'user@example.com', 'testpass123',
+        )
+        Recipe.objects.create(
+            user=self.user, title='Soup', time_minutes=5, price='1.00',
+        )
+        self.factory = APIRequestFactory()
+
+    def tearDown(self):
+        async_views.shutdown_executor()
+
+    def _list_request(self):
+        request = self.factory.get('/api/recipe/recipes/')
+        force_authenticate(request, self.user)
+        return request
+
+    def test_async_view_serves_viewset(self):
+        """Test the wrapped viewset responds with a rendered body."""
+        view = async_views.async_view(RecipeViewSet.as_view({'get': 'list'}))
+        self.assertTrue(asyncio.iscoroutinefunction(view))
+
+        res = async_to_sync(view)(self._list_request())
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.data['results'][0]['title'], 'Soup')
+        self.assertTrue(res.is_rendered)
+
+    def test_async_view_runs_requests_concurrently(self):
+        """Test requests run on separate pool threads at the same time."""
+        threads = set()
+
+        def slow_view(request):
+            threads.add(threading.get_ident())
+            time.sleep(0.3)
+            return HttpResponse()
+
+        view = async_views.async_view(slow_view)
+
+        async def run_two():
+            request = self.factory.get('/')
+            return await asyncio.gather(view(request), view(request))
+
+        start = time.perf_counter()
+        async_to_sync(run_two)()
+
+        self.assertLess(time.perf_counter() - start, 0.55)
+        self.assertEqual(len(threads), 2)
+        self.assertNotIn(threading.get_ident(), threads)
+
+    def test_async_middleware_records_pool_queries(self):
+        """Test metrics count the queries run on pool threads."""
+        view = async_views.async_view(RecipeViewSet.as_view({'get': 'list'}))
+
+        async def get_response(request):
+            return await view(request)
+
+        middleware = MetricsMiddleware(get_response)
+        self.assertTrue(asyncio.iscoroutinefunction(middleware))
+        labels = {'view': '<unresolved>', 'method': 'GET'}
+        before = REGISTRY.get_sample_value(
+            'http_request_db_queries_sum', labels,
+        ) or 0
+
+        async_to_sync(middleware)(self._list_request())
+
+        after = REGISTRY.get_sample_value(
+            'http_request_db_queries_sum', labels,
+        )
+        self.assertGreater(after, before)
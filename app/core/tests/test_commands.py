@@ -1,31 +1,226 @@
 """
 Test custom Django management commands.
 """
+import json
+import os
+import socket
+import tempfile
+from io import StringIO
 from unittest.mock import patch
 
 from psycopg2 import OperationalError as Psycopg2Error
 
-from django.core.management import call_command
+from django.contrib.auth import get_user_model
+from django.core.management import call_command, CommandError
+from django.db import connections
 from django.db.utils import OperationalError
-from django.test import SimpleTestCase
+from django.test import SimpleTestCase, TestCase, TransactionTestCase
 
+from core.management.commands.wait_for_db import (
+    Command as WaitForDbCommand,
+)
+from core.models import Recipe, Tag, Ingredient
 
-@patch('core.management.commands.wait_for_db.Command.check')
+
+@patch('core.management.commands.wait_for_db.Command.ping')
 class CommandTests(SimpleTestCase):
     """Test commands."""
 
-    def test_wait_for_db_ready(self, patched_check):
+    def test_wait_for_db_ready(self, patched_ping):
         """Test waiting for database if database ready."""
-        patched_check.return_value = True
-        call_command("wait_for_db")
-        patched_check.assert_called_once_with(databases=['default'])
+        patched_ping.return_value = None
+        call_command("wait_for_db", stdout=StringIO())
+        patched_ping.assert_called_once_with()
+
+    @patch("time.sleep")
+    def test_wait_for_db_delay(self, patched_sleep, patched_ping):
+        """Test waiting for database backs off exponentially."""
+        patched_ping.side_effect = [ConnectionRefusedError] + \
+                                   [Psycopg2Error]*2 + \
+                                   [OperationalError]*3 + \
+                                   [None, ]
+        call_command("wait_for_db", stdout=StringIO())
+        self.assertEqual(patched_ping.call_count, 7)
+        self.assertEqual(
+            [call.args[0] for call in patched_sleep.call_args_list],
+            [0.1, 0.2, 0.4, 0.8, 1.6, 2],
+        )
 
     @patch("time.sleep")
-    def test_wait_for_db_delay(self, patched_sleep, patched_check):
-        """Test waiting for database when getting OperationalError"""
-        patched_check.side_effect = [Psycopg2Error]*2 + \
-                                    [OperationalError]*3 + \
-                                    [True, ]
-        call_command("wait_for_db")
-        self.assert_(patched_check.call_count, 6)
-        patched_check.assert_called_with(databases=['default'])
+    def test_wait_for_db_timeout(self, patched_sleep, patched_ping):
+        """Test giving up once the timeout has passed."""
+        patched_ping.side_effect = OperationalError('refused')
+        with self.assertRaisesMessage(CommandError, 'after 0 seconds'):
+            call_command("wait_for_db", timeout=0, stdout=StringIO())
+        patched_sleep.assert_not_called()
+
+
+class WaitForDbPingTests(TransactionTestCase):
+    """Test the database ping itself."""
+
+    def test_ping(self):
+        """Test ping succeeds against the test database."""
+        WaitForDbCommand().ping()
+
+    def test_ping_refused(self):
+        """Test a TCP host with nothing listening fails fast."""
+        with socket.socket() as sock:
+            sock.bind(('127.0.0.1', 0))
+            port = sock.getsockname()[1]
+            with patch.dict(connections['default'].settings_dict,
+                            HOST='127.0.0.1', PORT=str(port)), \
+                    self.assertRaises(ConnectionRefusedError):
+                WaitForDbCommand().ping()
+
+
+class BenchmarkCommandTests(TestCase):
+    """Test the seeding and benchmarking commands."""
+
+    def _seed(self, **options):
+        call_command(
+            'seed_recipes', users=2, recipes=5, tags=4, ingredients=6,
+            stdout=StringIO(), **options,
+        )
+
+    def test_seed_recipes_uniform(self):
+        """Test seeding creates the requested volumes of data."""
+        self._seed(distribution='uniform')
+
+        users = get_user_model().objects.filter(email__startswith='bench-')
+        self.assertEqual(users.count(), 2)
+        self.assertEqual(Recipe.objects.count(), 10)
+        self.assertEqual(Tag.objects.count(), 8)
+        self.assertEqual(Ingredient.objects.count(), 12)
+        recipe = Recipe.objects.first()
+        self.assertEqual(recipe.tags.count(), 3)
+        self.assertEqual(recipe.ingredients.count(), 6)
+        self.assertIsNotNone(recipe.search_vector)
+        self.assertTrue(users[0].check_password('benchpass123'))
+
+    def test_seed_recipes_zipf_skews_towards_first_user(self):
+        """Test zipf seeding gives the first user the most recipes."""
+        self._seed()
+
+        first = Recipe.objects.filter(user__email='bench-0@example.com')
+        second = Recipe.objects.filter(user__email='bench-1@example.com')
+        self.assertGreater(first.count(), second.count())
+
+    def test_benchmark_api_writes_results(self):
+        """Test benchmarking reports every scenario and cleans up."""
+        self._seed(distribution='uniform')
+        recipes_before = Recipe.objects.count()
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            output = os.path.join(tmpdir, 'results.json')
+            call_command(
+                'benchmark_api', iterations=3, warmup=1, output=output,
+                scenarios='recipe-list,recipe-detail,recipe-create,'
+                          'recipe-update',
+                stdout=StringIO(),
+            )
+            with open(output) as f:
+                report = json.load(f)
+
+        self.assertEqual(Recipe.objects.count(), recipes_before)
+        for name in ('recipe-list', 'recipe-create', 'recipe-update'):
+            result = report['scenarios'][name]
+            self.assertEqual(result['requests'], 3)
+            self.assertLessEqual(result['p50_ms'], result['p99_ms'])
+        self.assertEqual(
+            report['scenarios']['recipe-create']['status_codes'], {'201': 3},
+        )
+        self.assertEqual(
+            report['scenarios']['recipe-list']['status_codes'], {'200': 3},
+        )
+
+    def test_benchmark_api_leaves_seeded_data_alone(self):
+        """Test the write scenarios use throwaway recipes and files."""
+        self._seed(distribution='uniform')
+        seeded = list(Recipe.objects.values().order_by('id'))
+
+        with tempfile.TemporaryDirectory() as media_root, \
+                tempfile.TemporaryDirectory() as tmpdir, \
+                self.settings(MEDIA_ROOT=media_root):
+            call_command(
+                'benchmark_api', iterations=2, warmup=1,
+                output=os.path.join(tmpdir, 'results.json'),
+                scenarios='recipe-update,upload-image', stdout=StringIO(),
+            )
+
+            self.assertEqual(
+                [files for _root, _dirs, files in os.walk(media_root)
+                 if files], [],
+            )
+        self.assertEqual(list(Recipe.objects.values().order_by('id')), seeded)
+
+    def test_benchmark_serializers_reports_every_case(self):
+        """Test the serializer benchmark runs each case."""
+        self._seed(distribution='uniform')
+        out = StringIO()
+
+        call_command('benchmark_serializers', iterations=1, stdout=out)
+
+        lines = out.getvalue().splitlines()
+        self.assertEqual(len(lines), 4)
+        self.assertTrue(lines[-1].startswith('summary rows, FastJSONRenderer'))
+
+
+class RebuildSummariesCommandTests(TestCase):
+    """Test the rebuild_summaries command."""
+
+    def setUp(self):
+        call_command(
+            'seed_recipes', users=1, recipes=3, tags=2, ingredients=2,
+            stdout=StringIO(),
+        )
+
+    def test_verify_passes_when_current(self):
+        """Test verification succeeds right after seeding."""
+        out = StringIO()
+        call_command('rebuild_summaries', verify=True, stdout=out)
+        self.assertIn('current', out.getvalue())
+
+    def test_verify_fails_then_rebuild_fixes(self):
+        """Test stale summaries are reported and then rebuilt."""
+        recipe = Recipe.objects.first()
+        Recipe.objects.filter(pk=recipe.pk).update(summary=None)
+        tag = recipe.tags.order_by('id').first()
+        Tag.objects.filter(pk=tag.pk).update(name='Renamed')
+
+        with self.assertRaises(CommandError):
+            call_command('rebuild_summaries', verify=True, stdout=StringIO())
+
+        call_command('rebuild_summaries', batch_size=2, stdout=StringIO())
+
+        call_command('rebuild_summaries', verify=True, stdout=StringIO())
+        recipe.refresh_from_db()
+        self.assertEqual(recipe.summary['tags'][0]['name'], 'Renamed')
+
+
+class ProfileImportsCommandTests(SimpleTestCase):
+    """Test the profile_imports command."""
+
+    def test_reports_and_writes_profile(self):
+        """Test the total, slowest imports and JSON profile are reported."""
+        out = StringIO()
+        with tempfile.TemporaryDirectory() as directory:
+            output = os.path.join(directory, 'imports.json')
+
+            call_command('profile_imports', module='core.summary', top=3,
+                         output=output, stdout=out)
+
+            with open(output) as f:
+                profile = json.load(f)
+
+        lines = out.getvalue().splitlines()
+        self.assertRegex(lines[0], r'^Importing core.summary took [\d.]+ ms')
+        self.assertEqual(len(lines), 5)
+        modules = {row['module']: row for row in profile['imports']}
+        self.assertEqual(modules['core.summary']['depth'], 0)
+        self.assertIn('django.db.models', modules)
+
+    def test_failed_import(self):
+        """Test a module that cannot be imported raises CommandError."""
+        with self.assertRaises(CommandError):
+            call_command('profile_imports', module='no_such_module',
+                         stdout=StringIO())
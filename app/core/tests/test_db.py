@@ -0,0 +1,52 @@
+"""
+Tests for database connection helpers.
+"""
+from unittest.mock import patch, MagicMock
+
+from django.test import SimpleTestCase
+
+from core import db
+
+
+def make_connection(health_checks=True, connected=True, usable=True):
+    """Return a mock connection wrapper."""
+    conn = MagicMock()
+    conn.settings_dict = {'CONN_HEALTH_CHECKS': health_checks}
+    conn.connection = object() if connected else None
+    conn.is_usable.return_value = usable
+    return conn
+
+
+@patch('core.db.connections')
+class ConnectionHealthCheckTests(SimpleTestCase):
+    """Test health checks for persistent connections."""
+
+    def test_unusable_connection_closed(self, patched_connections):
+        """Test a reused connection failing the ping is closed."""
+        conn = make_connection(usable=False)
+        patched_connections.all.return_value = [conn]
+
+        db.close_unusable_connections()
+
+        conn.close.assert_called_once()
+
+    def test_usable_connection_kept(self, patched_connections):
+        """Test a healthy connection is kept open."""
+        conn = make_connection()
+        patched_connections.all.return_value = [conn]
+
+        db.close_unusable_connections()
+
+        conn.close.assert_not_called()
+
+    def test_health_checks_disabled(self, patched_connections):
+        """Test connections are not pinged when checks are disabled."""
+        conn = make_connection(health_checks=False, usable=False)
+        unopened = make_connection(connected=False)
+        patched_connections.all.return_value = [conn, unopened]
+
+        db.close_unusable_connections()
+
+        conn.is_usable.assert_not_called()
+        unopened.is_usable.assert_not_called()
+        conn.close.assert_not_called()
@@ -0,0 +1,186 @@
+"""
+Tests for the metrics middleware and endpoint.
+"""
+import json
+import os
+import socketserver
+import tempfile
+import threading
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from prometheus_client import REGISTRY
+from rest_framework.test import APIClient
+
+METRICS_URL = reverse('metrics')
+UWSGI_STATS = {
+    'listen_queue': 3,
+    'listen_queue_errors': 1,
+    'workers': [
+        {'id': 1, 'status': 'busy', 'requests': 10, 'avg_rt': 25000,
+         'rss': 1024, 'cores': [{'in_request': 1}, {'in_request': 1}]},
+        {'id': 0, 'status': 'cheap', 'requests': 0, 'avg_rt': 0,
+         'rss': 0, 'cores': []},
+    ],
+}
+RECIPES_URL = reverse('recipe:recipe-list')
+
+
+def sample(name, **labels):
+    """Return the current value of a sample, or 0 if not yet recorded."""
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+class MetricsTests(TestCase):
+    """Test request instrumentation."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            'user@example.com', 'testpass123',
+        )
+        self.client.force_authenticate(self.user)
+
+    def test_records_request_by_view_name(self):
+        """Test latency, query count and size are labelled by view."""
+        labels = {'view': 'recipe:recipe-list', 'method': 'GET'}
+        requests = sample('http_request_duration_seconds_count',
+                          status='200', **labels)
+        queries = sample('http_request_db_queries_sum', **labels)
+        size = sample('http_response_size_bytes_sum', **labels)
+
+        res = self.client.get(RECIPES_URL)
+
+        self.assertEqual(
+            sample('http_request_duration_seconds_count',
+                   status='200', **labels),
+            requests + 1,
+        )
+        self.assertGreater(
+            sample('http_request_db_queries_sum', **labels), queries,
+        )
+        self.assertEqual(
+            sample('http_response_size_bytes_sum', **labels),
+            size + len(res.content),
+        )
+
+    def test_unresolved_requests_share_one_label(self):
+        """Test unknown URLs do not create a label per path."""
+        labels = {'view': '<unresolved>', 'method': 'GET', 'status': '404'}
+        before = sample('http_request_duration_seconds_count', **labels)
+
+        self.client.get('/no/such/page/')
+
+        self.assertEqual(
+            sample('http_request_duration_seconds_count', **labels),
+            before + 1,
+        )
+
+    @override_settings(SLOW_QUERY_THRESHOLD_MS=0)
+    def test_slow_queries_logged(self):
+        """Test queries over the threshold are logged and counted."""
+        labels = {'view': 'recipe:recipe-list'}
+        before = sample('db_slow_queries_total', **labels)
+
+        with self.assertLogs('core.slow_queries', 'WARNING') as logs:
+            self.client.get(RECIPES_URL)
+
+        self.assertIn('core_recipe', logs.output[-1])
+        self.assertGreater(sample('db_slow_queries_total', **labels), before)
+
+    @override_settings(SLOW_QUERY_THRESHOLD_MS=0)
+    def test_slow_query_params_not_logged(self):
+        """Test bound parameters are kept out of the slow query log."""
+        with self.assertLogs('core.slow_queries', 'WARNING') as logs:
+            self.client.get(RECIPES_URL, {'search': 'secret-term'})
+
+        self.assertTrue(logs.output)
+        for line in logs.output:
+            self.assertNotIn('secret', line)
+            self.assertNotIn('params=', line)
+
+    @override_settings(METRICS_AUTH_TOKEN=None, DEBUG=True)
+    def test_metrics_endpoint(self):
+        """Test metrics are served in the Prometheus text format."""
+        self.client.get(RECIPES_URL)
+
+        res = self.client.get(METRICS_URL)
+
+        self.assertEqual(res.status_code, 200)
+        self.assertTrue(res['Content-Type'].startswith('text/plain'))
+        self.assertIn(
+            b'http_request_duration_seconds_bucket{', res.content,
+        )
+
+    @override_settings(METRICS_AUTH_TOKEN=None, DEBUG=False)
+    def test_metrics_endpoint_hidden_without_token(self):
+        """Test metrics aren't served without a token outside DEBUG."""
+        res = self.client.get(METRICS_URL)
+
+        self.assertEqual(res.status_code, 404)
+
+    @override_settings(METRICS_AUTH_TOKEN='secret')
+    def test_metrics_endpoint_requires_token(self):
+        """Test the configured bearer token protects the endpoint."""
+        res = self.client.get(METRICS_URL)
+        self.assertEqual(res.status_code, 403)
+
+        res = self.client.get(
+            METRICS_URL, HTTP_AUTHORIZATION='Bearer secret',
+        )
+        self.assertEqual(res.status_code, 200)
+
+
+@override_settings(METRICS_AUTH_TOKEN='secret')
+class UwsgiStatsTests(TestCase):
+    """Test uWSGI stats are exported with the app's metrics."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer secret')
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.address = os.path.join(directory.name, 'stats.sock')
+
+    def serve_stats(self):
+        """Serve UWSGI_STATS on self.address like the uWSGI master."""
+
+        class Handler(socketserver.BaseRequestHandler):
+            def handle(self):
+                self.request.sendall(json.dumps(UWSGI_STATS).encode())
+
+        server = socketserver.UnixStreamServer(self.address, Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+
+    def test_stats_exported(self):
+        """Test queue, worker and per-worker stats appear in /metrics."""
+        self.serve_stats()
+
+        with self.settings(UWSGI_STATS=self.address):
+            res = self.client.get(METRICS_URL)
+
+        self.assertEqual(res.status_code, 200)
+        for line in (
+            b'uwsgi_stats_up 1.0',
+            b'uwsgi_listen_queue 3.0',
+            b'uwsgi_listen_queue_errors_total 1.0',
+            b'uwsgi_workers{status="busy"} 1.0',
+            b'uwsgi_workers{status="cheap"} 1.0',
+            b'uwsgi_busy_threads 2.0',
+            b'uwsgi_worker_requests_total{worker="1"} 10.0',
+            b'uwsgi_worker_requests_total{worker="2"} 0.0',
+            b'uwsgi_worker_avg_response_seconds{worker="1"} 0.025',
+        ):
+            self.assertIn(line + b'\n', res.content)
+
+    def test_stats_unavailable(self):
+        """Test an unreachable stats socket is reported, not an error."""
+        with self.settings(UWSGI_STATS=self.address), \
+                self.assertLogs('core.metrics', 'WARNING'):
+            res = self.client.get(METRICS_URL)
+
+        self.assertEqual(res.status_code, 200)
+        self.assertIn(b'uwsgi_stats_up 0.0\n', res.content)
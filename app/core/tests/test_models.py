@@ -1,6 +1,7 @@
 """
 Tests for models.
 """
+from django.db import IntegrityError, connection
 from django.test import TestCase
 from django.contrib.auth import get_user_model
 from decimal import Decimal
@@ -55,6 +56,20 @@ class TestModels(TestCase):
         self.assertTrue(user.is_superuser)
         self.assertTrue(user.is_staff)
 
+    def test_user_save_keeps_data_version(self):
+        """Test a full save doesn't roll back a concurrent version bump."""
+        user = get_user_model().objects.create_user(
+            'test@example.com', 'testpass123',
+        )
+        get_user_model().objects.filter(pk=user.pk).update(data_version=5)
+
+        user.name = 'Renamed'
+        user.save()
+
+        user.refresh_from_db()
+        self.assertEqual(user.name, 'Renamed')
+        self.assertEqual(user.data_version, 5)
+
     def test_create_recipe(self):
         """Test creating a recipe is successful."""
         user = get_user_model().objects.create_user(
@@ -94,3 +109,37 @@ class TestModels(TestCase):
         file_path = models.recipe_image_file_path(None, 'example.jpg')
 
         self.assertEqual(file_path, f'uploads/recipe/{uuid}.jpg')
+
+    def test_tag_name_unique_per_user(self):
+        """Test a user cannot have two tags with the same name."""
+        user = create_user()
+        other = create_user(email='other@example.com')
+        models.Tag.objects.create(user=user, name='Vegan')
+        models.Tag.objects.create(user=other, name='Vegan')
+
+        with self.assertRaises(IntegrityError):
+            models.Tag.objects.create(user=user, name='Vegan')
+
+    def _explain(self, queryset):
+        """Return the query plan for queryset with seq scans disabled."""
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+        return queryset.explain()
+
+    def test_recipe_user_newest_index_used(self):
+        """Test listing a user's recipes uses the (user, -id) index."""
+        user = create_user()
+        plan = self._explain(
+            models.Recipe.objects.filter(user=user).order_by('-id')
+        )
+
+        self.assertIn('recipe_user_newest_idx', plan)
+
+    def test_tag_user_name_index_used(self):
+        """Test looking up tags by name uses the (user, name) index."""
+        user = create_user()
+        plan = self._explain(
+            models.Tag.objects.filter(user=user, name__in=['A', 'B'])
+        )
+
+        self.assertIn('tag_user_name_unique', plan)
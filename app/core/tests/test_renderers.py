@@ -0,0 +1,60 @@
+"""
+Tests for the orjson renderer and parser.
+"""
+import io
+from datetime import datetime, timezone
+from decimal import Decimal
+
+from django.test import SimpleTestCase
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+
+from core.parsers import FastJSONParser
+from core.renderers import FastJSONRenderer
+
+
+class FastJSONTests(SimpleTestCase):
+    """Test FastJSONRenderer and FastJSONParser."""
+
+    def test_render_matches_json_renderer(self):
+        """Test output is byte-for-byte what JSONRenderer produces."""
+        data = {
+            'title': 'Crème brûlée \u2028',
+            'created': datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone.utc),
+            'message': _('Not found.'),
+            'items': [1, 2.5, None, True, {'nested': []}],
+        }
+
+        self.assertEqual(
+            FastJSONRenderer().render(data), JSONRenderer().render(data),
+        )
+
+    def test_render_decimal_exactly(self):
+        """Test decimals render as exact strings rather than floats."""
+        data = {'price': Decimal('5.10'), 'big': Decimal('0.1') * 3}
+
+        self.assertEqual(
+            FastJSONRenderer().render(data),
+            b'{"price":"5.10","big":"0.3"}',
+        )
+
+    def test_render_indent_uses_json_renderer(self):
+        """Test indented output still honours the indent parameter."""
+        rendered = FastJSONRenderer().render(
+            {'a': 1}, 'application/json; indent=2',
+        )
+        self.assertEqual(rendered, b'{\n  "a": 1\n}')
+
+    def test_parse(self):
+        """Test UTF-8 JSON bodies are parsed."""
+        stream = io.BytesIO('{"title": "Crème", "price": 5.1}'.encode())
+
+        data = FastJSONParser().parse(stream)
+
+        self.assertEqual(data, {'title': 'Crème', 'price': 5.1})
+
+    def test_parse_error(self):
+        """Test malformed bodies raise a ParseError."""
+        with self.assertRaises(ParseError):
+            FastJSONParser().parse(io.BytesIO(b'{"title": '))
@@ -0,0 +1,92 @@
+"""
+Tests for the cached OpenAPI schema endpoint.
+"""
+import gzip
+import json
+import os
+import tempfile
+from unittest.mock import patch
+
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from core import schema
+
+SCHEMA_URL = reverse('api-schema')
+
+
+class CachedSchemaTests(TestCase):
+    """Test the schema is generated once and served with ETag and gzip."""
+
+    def setUp(self):
+        self.client = APIClient()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.cache_dir = directory.name
+        override = self.settings(SCHEMA_CACHE_DIR=self.cache_dir)
+        override.enable()
+        self.addCleanup(override.disable)
+        schema._cache.clear()
+        self.addCleanup(schema._cache.clear)
+
+    def get(self, **extra):
+        return self.client.get(SCHEMA_URL, {'format': 'json'}, **extra)
+
+    def test_generated_once(self):
+        """Test repeated requests reuse the schema generated first."""
+        with patch.object(
+            schema, '_generate', wraps=schema._generate,
+        ) as generate:
+            first = self.get()
+            second = self.get()
+
+        self.assertEqual(generate.call_count, 1)
+        self.assertEqual(first.content, second.content)
+        document = json.loads(first.content)
+        self.assertIn('/api/recipe/recipes/', document['paths'])
+        self.assertEqual(first['Cache-Control'], 'public, max-age=300')
+
+    def test_loaded_from_disk(self):
+        """Test a new process reads the schema built by build_schema."""
+        schema.build_schemas()
+        schema._cache.clear()
+
+        with patch.object(schema, '_generate') as generate:
+            res = self.get()
+
+        generate.assert_not_called()
+        self.assertEqual(res.status_code, 200)
+        self.assertTrue(any(
+            name.endswith('.json') for name in os.listdir(self.cache_dir)
+        ))
+
+    def test_etag_not_modified(self):
+        """Test a matching If-None-Match gets 304 without a body."""
+        etag = self.get()['ETag']
+
+        res = self.get(HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, 304)
+        self.assertEqual(res.content, b'')
+        self.assertEqual(res['ETag'], etag)
+
+    def test_gzip(self):
+        """Test clients accepting gzip get the precompressed copy."""
+        plain = self.get()
+
+        res = self.get(HTTP_ACCEPT_ENCODING='gzip, deflate')
+
+        self.assertEqual(res['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(res.content), plain.content)
+        self.assertNotEqual(res['ETag'], plain['ETag'])
+        self.assertIn('Accept-Encoding', res['Vary'])
+
+    def test_yaml_by_default(self):
+        """Test content negotiation still picks the format."""
+        res = self.client.get(SCHEMA_URL)
+
+        self.assertTrue(res['Content-Type'].startswith(
+            'application/vnd.oai.openapi',
+        ))
+        self.assertTrue(res.content.startswith(b'openapi: '))
@@ -0,0 +1,48 @@
+"""
+Tests for the precompressed manifest static files storage.
+"""
+import gzip
+import json
+import os
+import tempfile
+
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from django.test import SimpleTestCase
+
+
+class CompressedManifestStorageTests(SimpleTestCase):
+    """Test collectstatic output."""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.root = directory.name
+        with self.settings(STATIC_ROOT=self.root):
+            call_command('collectstatic', interactive=False, verbosity=0)
+            self.url = staticfiles_storage.url('admin/css/base.css')
+
+    def test_hashed_files_in_manifest(self):
+        """Test files are copied under content-hashed names."""
+        with open(os.path.join(self.root, 'staticfiles.json')) as manifest:
+            paths = json.load(manifest)['paths']
+
+        hashed = paths['admin/css/base.css']
+        self.assertRegex(hashed, r'^admin/css/base\.[0-9a-f]{12}\.css$')
+        self.assertEqual(self.url, f'/static/static/{hashed}')
+        self.assertTrue(os.path.exists(os.path.join(self.root, hashed)))
+
+    def test_text_files_precompressed(self):
+        """Test a .gz with the same content is written beside text files."""
+        name = self.url[len('/static/static/'):]
+        path = os.path.join(self.root, name)
+
+        with open(path, 'rb') as original, \
+                gzip.open(f'{path}.gz') as compressed:
+            self.assertEqual(compressed.read(), original.read())
+
+    def test_images_not_compressed(self):
+        """Test already-compressed formats get no .gz."""
+        for directory, _, files in os.walk(self.root):
+            for name in files:
+                self.assertFalse(name.endswith(('.png.gz', '.gif.gz')))
@@ -0,0 +1,47 @@
+"""
+Tests for per-request uWSGI time limits.
+"""
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+RECIPES_URL = reverse('recipe:recipe-list')
+IMPORT_URL = reverse('recipe:recipe-bulk-import')
+EXPORT_URL = reverse('recipe:recipe-export')
+
+
+@override_settings(REQUEST_TIMEOUT=60, BULK_REQUEST_TIMEOUT=600)
+@patch('core.timeouts.uwsgi')
+class RequestTimeoutTests(TestCase):
+    """Test requests get the short limit and bulk views the long one."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            'user@example.com', 'testpass123',
+        )
+        self.client.force_authenticate(self.user)
+
+    def test_requests_limited(self, patched_uwsgi):
+        """Test ordinary requests are limited to REQUEST_TIMEOUT."""
+        self.client.get(RECIPES_URL)
+
+        patched_uwsgi.set_user_harakiri.assert_called_once_with(60)
+
+    def test_export_extended(self, patched_uwsgi):
+        """Test exports may run for BULK_REQUEST_TIMEOUT."""
+        res = self.client.get(EXPORT_URL)
+        b''.join(res.streaming_content)
+
+        patched_uwsgi.set_user_harakiri.assert_called_with(600)
+
+    def test_import_extended(self, patched_uwsgi):
+        """Test imports may run for BULK_REQUEST_TIMEOUT."""
+        self.client.post(
+            IMPORT_URL, b'', content_type='application/x-ndjson',
+        )
+
+        patched_uwsgi.set_user_harakiri.assert_called_with(600)
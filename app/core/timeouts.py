@@ -0,0 +1,44 @@
+"""
+Per-request time limits for uWSGI workers.
+
+uWSGI's --harakiri is set to BULK_REQUEST_TIMEOUT (see scripts/run.sh), the
+longest any request may run. RequestTimeoutMiddleware lowers it to
+REQUEST_TIMEOUT for each request, and the bulk import and export views
+raise it back for theirs.
+"""
+import asyncio
+
+from django.conf import settings
+
+try:
+    import uwsgi
+except ImportError:
+    # Not running under uWSGI: runserver, tests or uvicorn.
+    uwsgi = None
+
+
+def set_request_timeout(seconds):
+    """Kill the worker if the current request runs longer than seconds.
+
+    The limit cannot exceed --harakiri, and uWSGI clears it once the
+    request (including a streamed response) has finished.
+    """
+    if uwsgi is not None:
+        uwsgi.set_user_harakiri(int(seconds))
+
+
+class RequestTimeoutMiddleware:
+    """Limit every request to REQUEST_TIMEOUT seconds."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self):
+            return self.get_response(request)
+        set_request_timeout(settings.REQUEST_TIMEOUT)
+        return self.get_response(request)
@@ -1,6 +1,18 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_save, post_delete, m2m_changed
 
 
 class RecipeConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'recipe'
+
+    def ready(self):
+        from core.models import Recipe, Tag, Ingredient
+
+        from . import caching
+
+        for model in (Recipe, Tag, Ingredient):
+            post_save.connect(caching.bump_on_save, sender=model)
+            post_delete.connect(caching.bump_on_save, sender=model)
+        for through in (Recipe.tags.through, Recipe.ingredients.through):
+            m2m_changed.connect(caching.bump_on_m2m_change, sender=through)
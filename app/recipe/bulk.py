@@ -0,0 +1,176 @@
+"""
+Bulk import and export helpers for recipe APIs.
+"""
+import csv
+import io
+import json
+
+from django.db import transaction
+from django.db.models import prefetch_related_objects
+from rest_framework.utils.encoders import JSONEncoder
+
+from core.models import Recipe, Tag, Ingredient
+from core.search import update_search_vectors
+from core.summary import update_summaries
+from .caching import bump_user_version
+
+IMPORT_CHUNK_SIZE = 500
+IMPORT_MAX_REPORTED_ERRORS = 1000
+EXPORT_CHUNK_SIZE = 1000
+EXPORT_CSV_FIELDS = [
+    'id', 'title', 'description', 'time_minutes', 'price', 'link', 'image',
+    'tags', 'ingredients',
+]
+
+
+def get_or_create_by_name(model, user, names):
+    """Return user's objects keyed by name, bulk creating missing ones."""
+    names = list(dict.fromkeys(names))
+    if not names:
+        return {}
+    existing = {
+        obj.name: obj
+        for obj in model.objects.filter(user=user, name__in=names)
+    }
+    missing = [name for name in names if name not in existing]
+    if missing:
+        # Rows created concurrently are skipped by the (user, name) unique
+        # constraint and picked up by the follow-up lookup.
+        model.objects.bulk_create(
+            [model(user=user, name=name) for name in missing],
+            ignore_conflicts=True,
+        )
+        existing.update(
+            (obj.name, obj)
+            for obj in model.objects.filter(user=user, name__in=missing)
+        )
+    return existing
+
+
+def _link_by_name(recipes, rows, field, model, user):
+    """Bulk insert through rows linking recipes to named objects."""
+    by_name = get_or_create_by_name(
+        model, user,
+        (item['name'] for row in rows for item in row.get(field, [])),
+    )
+    through = getattr(Recipe, field).through
+    target = f'{model._meta.model_name}_id'
+    links = {
+        (recipe.id, by_name[item['name']].id)
+        for recipe, row in zip(recipes, rows)
+        for item in row.get(field, [])
+    }
+    through.objects.bulk_create(
+        [through(recipe_id=recipe_id, **{target: obj_id})
+         for recipe_id, obj_id in links],
+        batch_size=IMPORT_CHUNK_SIZE,
+    )
+
+
+@transaction.atomic
+def _write_chunk(rows, user):
+    """Insert a chunk of validated recipes with their relations."""
+    recipes = Recipe.objects.bulk_create([
+        Recipe(user=user, **{
+            key: value for key, value in row.items()
+            if key not in ('tags', 'ingredients')
+        })
+        for row in rows
+    ])
+    _link_by_name(recipes, rows, 'tags', Tag, user)
+    _link_by_name(recipes, rows, 'ingredients', Ingredient, user)
+    created = Recipe.objects.filter(pk__in=[recipe.pk for recipe in recipes])
+    update_search_vectors(created)
+    update_summaries(created)
+    return len(recipes)
+
+
+def import_recipes(lines, serializer_class, context, chunk_size=None):
+    """Validate and insert recipes from (line number, raw JSON) pairs.
+
+    Rows are validated one by one and written in chunks, so memory use is
+    bounded by the chunk size rather than the size of the input.
+    """
+    chunk_size = chunk_size or IMPORT_CHUNK_SIZE
+    user = context['request'].user
+    summary = {'created': 0, 'failed': 0, 'errors': []}
+    chunk = []
+
+    def add_error(lineno, errors):
+        summary['failed'] += 1
+        if len(summary['errors']) < IMPORT_MAX_REPORTED_ERRORS:
+            summary['errors'].append({'line': lineno, 'errors': errors})
+
+    for lineno, line in lines:
+        try:
+            data = json.loads(line)
+        except ValueError as exc:
+            add_error(lineno, {'non_field_errors': [f'Invalid JSON: {exc}']})
+            continue
+        serializer = serializer_class(data=data, context=context)
+        if not serializer.is_valid():
+            add_error(lineno, serializer.errors)
+            continue
+        chunk.append(serializer.validated_data)
+        if len(chunk) >= chunk_size:
+            summary['created'] += _write_chunk(chunk, user)
+            chunk = []
+
+    if chunk:
+        summary['created'] += _write_chunk(chunk, user)
+
+    if summary['created']:
+        # bulk_create() sends no signals, so invalidate cached responses here.
+        bump_user_version(user.pk)
+
+    return summary
+
+
+def iter_recipe_chunks(queryset, chunk_size=None):
+    """Yield lists of recipes, newest first, one keyset page at a time.
+
+    Each chunk is its own LIMITed query continuing below the last id, so
+    memory stays flat even without server-side cursors (which
+    DB_DISABLE_SERVER_SIDE_CURSORS turns off for PgBouncer). Tags and
+    ingredients are prefetched once per chunk.
+    """
+    chunk_size = chunk_size or EXPORT_CHUNK_SIZE
+    queryset = queryset.order_by('-pk')
+    chunk = list(queryset[:chunk_size])
+    while chunk:
+        prefetch_related_objects(chunk, 'tags', 'ingredients')
+        yield chunk
+        if len(chunk) < chunk_size:
+            break
+        chunk = list(queryset.filter(pk__lt=chunk[-1].pk)[:chunk_size])
+
+
+def export_recipes_ndjson(queryset, serializer_class, context):
+    """Yield recipes as newline-delimited JSON, one chunk at a time."""
+    for chunk in iter_recipe_chunks(queryset):
+        data = serializer_class(chunk, many=True, context=context).data
+        yield ''.join(json.dumps(row, cls=JSONEncoder) + '\n' for row in data)
+
+
+def export_recipes_csv(queryset, serializer_class, context):
+    """Yield recipes as CSV rows, with tag/ingredient names '|' joined."""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(
+        buffer, fieldnames=EXPORT_CSV_FIELDS, extrasaction='ignore',
+    )
+    writer.writeheader()
+    for chunk in iter_recipe_chunks(queryset):
+        data = serializer_class(chunk, many=True, context=context).data
+        for row in data:
+            writer.writerow({
+                **row,
+                'tags': '|'.join(tag['name'] for tag in row['tags']),
+                'ingredients': '|'.join(
+                    ingredient['name'] for ingredient in row['ingredients']
+                ),
+            })
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
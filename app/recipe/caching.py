@@ -0,0 +1,122 @@
+"""
+Per-user response caching and conditional GET support for recipe APIs.
+"""
+import hashlib
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db.models import F
+from django.http import HttpResponse
+from django.utils.http import parse_etags, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+from user.authentication import CachedTokenAuthentication, invalidate_users
+
+
+def _cache():
+    """Return the cache holding rendered response bodies."""
+    return caches[settings.RESPONSE_CACHE_ALIAS]
+
+
+def bump_user_version(user_id):
+    """Invalidate every cached response of a user."""
+    get_user_model().objects.filter(pk=user_id).update(
+        data_version=F('data_version') + 1,
+    )
+    # The version is also served from the authentication snapshot.
+    invalidate_users([user_id])
+
+
+def get_user_version(request):
+    """Return the current data version of the requesting user.
+
+    CachedTokenAuthentication loads it with the user, from a snapshot
+    bump_user_version drops. Other authenticators may hand over any User
+    instance (force_authenticate, for one), so it is read again for them.
+    """
+    if isinstance(request.successful_authenticator,
+                  CachedTokenAuthentication):
+        return request.user.data_version
+    return get_user_model().objects.filter(
+        pk=request.user.pk,
+    ).values_list('data_version', flat=True).first()
+
+
+def make_etag(request, version):
+    """Return a strong ETag for the request at the given data version."""
+    params = sorted(request.query_params.lists())
+    raw = '|'.join([
+        str(request.user.pk),
+        str(version),
+        request.get_host(),
+        request.path,
+        repr(params),
+        request.accepted_renderer.format,
+    ])
+    return quote_etag(hashlib.sha256(raw.encode()).hexdigest())
+
+
+def etag_matches(request, etag):
+    """Return whether If-None-Match matches etag by weak comparison.
+
+    nginx's gzip turns the strong ETag into a weak W/"..." one on the way
+    out, so clients send that form back.
+    """
+    etags = parse_etags(request.META.get('HTTP_IF_NONE_MATCH', ''))
+    return '*' in etags or etag in (
+        tag[2:] if tag.startswith('W/') else tag for tag in etags
+    )
+
+
+class ConditionalCacheMixin:
+    """Serve list with per-user ETags and cached rendered bodies.
+
+    The ETag covers the user's data version and the full request, so
+    If-None-Match is answered with a 304 without touching the queryset, and
+    bodies can be cached under the ETag without explicit purges. Viewsets
+    with a retrieve action wrap it with _cached_response as well.
+    """
+
+    def _cached_response(self, handler, request, *args, **kwargs):
+        etag = make_etag(request, get_user_version(request))
+        if etag_matches(request, etag):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+            response['ETag'] = etag
+            return response
+
+        cache_key = f'response:{etag}'
+        cached = _cache().get(cache_key)
+        if cached is not None:
+            content, content_type = cached
+            response = HttpResponse(content, content_type=content_type)
+            response['ETag'] = etag
+            return response
+
+        response = handler(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            response['ETag'] = etag
+            response.add_post_render_callback(
+                lambda rendered: _cache().set(
+                    cache_key,
+                    (rendered.content, rendered['Content-Type']),
+                )
+            )
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self._cached_response(
+            super().list, request, *args, **kwargs
+        )
+
+
+def bump_on_save(sender, instance, **kwargs):
+    """Signal handler bumping the owner's version on save or delete."""
+    bump_user_version(instance.user_id)
+
+
+def bump_on_m2m_change(sender, instance, action, **kwargs):
+    """Signal handler bumping the owner's version on relation changes."""
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        bump_user_version(instance.user_id)
@@ -0,0 +1,148 @@
+"""
+Background generation of resized recipe image renditions.
+"""
+import io
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connections, transaction
+
+from core.models import Recipe
+from .caching import bump_user_version
+
+logger = logging.getLogger(__name__)
+
+# Bounding boxes of the generated sizes, in pixels.
+RENDITION_SIZES = {
+    'thumbnail': (200, 200),
+    'medium': (800, 800),
+}
+# Pillow format name and encoder options per output format.
+RENDITION_FORMATS = {
+    'webp': ('WEBP', {'quality': 80, 'method': 4}),
+    'jpeg': ('JPEG', {'quality': 85, 'optimize': True, 'progressive': True}),
+}
+
+_executor = None
+_lock = threading.Lock()
+
+
+def get_executor():
+    """Return the process-wide pool running rendition jobs.
+
+    Created lazily so that a pre-forking server starts it in each worker
+    rather than in the master.
+    """
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.IMAGE_RENDITION_WORKERS,
+                thread_name_prefix='renditions',
+            )
+    return _executor
+
+
+def rendition_path(image_name, size, fmt):
+    """Return the storage path of a rendition of image_name."""
+    root, _ext = os.path.splitext(image_name)
+    directory, filename = os.path.split(root)
+    return os.path.join(directory, 'renditions', f'{filename}-{size}.{fmt}')
+
+
+def render_renditions(image_file):
+    """Return {(size, format): bytes} of resized, re-encoded copies.
+
+    The image is rotated according to its EXIF orientation and saved
+    without any EXIF or other metadata.
+    """
+    # Imported here: only uploads need Pillow, and it adds ~20 ms to
+    # every worker's startup.
+    from PIL import Image, ImageOps
+
+    with Image.open(image_file) as original:
+        image = ImageOps.exif_transpose(original).convert('RGB')
+
+    renditions = {}
+    for size, box in RENDITION_SIZES.items():
+        resized = image.copy()
+        resized.thumbnail(box, Image.Resampling.LANCZOS)
+        for fmt, (pil_format, options) in RENDITION_FORMATS.items():
+            buffer = io.BytesIO()
+            resized.save(buffer, format=pil_format, **options)
+            renditions[(size, fmt)] = buffer.getvalue()
+    return renditions
+
+
+def _rendition_paths(renditions):
+    """Return the storage paths in a {size: {format: path}} mapping."""
+    return {path for formats in renditions.values()
+            for path in formats.values()}
+
+
+def generate_renditions(recipe_id, image_name, previous=None):
+    """Generate and record the renditions of a recipe's image.
+
+    previous holds the renditions of the image it replaced, which are
+    deleted once nothing refers to them.
+    """
+    with default_storage.open(image_name) as image_file:
+        renditions = render_renditions(image_file)
+
+    paths = {}
+    for (size, fmt), content in renditions.items():
+        path = rendition_path(image_name, size, fmt)
+        if default_storage.exists(path):
+            default_storage.delete(path)
+        paths.setdefault(size, {})[fmt] = default_storage.save(
+            path, ContentFile(content),
+        )
+
+    stale = _rendition_paths(previous or {})
+    # Skip recipes whose image was replaced while this job ran.
+    recipe = Recipe.objects.filter(pk=recipe_id, image=image_name)
+    if recipe.update(image_renditions=paths):
+        bump_user_version(recipe.values_list('user_id', flat=True)[0])
+        stale -= _rendition_paths(paths)
+    else:
+        stale |= _rendition_paths(paths)
+    for path in stale:
+        default_storage.delete(path)
+
+
+def _generate_in_background(recipe_id, image_name, previous):
+    """Run generate_renditions in a pool thread."""
+    try:
+        generate_renditions(recipe_id, image_name, previous)
+    except Exception:
+        logger.exception('Failed to generate renditions for %s.', image_name)
+    finally:
+        # Pool threads are long-lived; don't leak their DB connections.
+        connections.close_all()
+
+
+def schedule_renditions(recipe, previous=None):
+    """Generate the renditions of recipe.image off the request thread.
+
+    previous are the renditions of the image recipe.image replaced.
+    """
+    recipe_id, image_name = recipe.pk, recipe.image.name
+    transaction.on_commit(
+        lambda: get_executor().submit(
+            _generate_in_background, recipe_id, image_name, previous,
+        )
+    )
+
+
+def shutdown_executor(wait=True):
+    """Stop the rendition pool, optionally waiting for queued jobs."""
+    global _executor
+    with _lock:
+        if _executor is not None:
+            _executor.shutdown(wait=wait)
+            _executor = None
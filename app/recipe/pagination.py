@@ -0,0 +1,29 @@
+"""
+Pagination classes for recipe APIs.
+"""
+from rest_framework.pagination import CursorPagination
+
+
+class RecipeCursorPagination(CursorPagination):
+    """Keyset pagination for recipes, newest first.
+
+    Search results are paged by relevance instead; the rank annotation is a
+    double so its cursor position round-trips exactly.
+    """
+    ordering = '-id'
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+
+    def get_ordering(self, request, queryset, view):
+        if 'rank' in queryset.query.annotations:
+            return ('-rank', '-id')
+        return super().get_ordering(request, queryset, view)
+
+
+class RecipeAttrCursorPagination(CursorPagination):
+    """Keyset pagination for tags and ingredients, by name."""
+    ordering = ('-name', 'id')
+    page_size = 100
+    page_size_query_param = 'page_size'
+    max_page_size = 500
@@ -0,0 +1,22 @@
+"""
+Parsers for recipe APIs.
+"""
+from rest_framework.parsers import BaseParser
+
+
+class NDJSONParser(BaseParser):
+    """Lazily split a newline-delimited JSON body into lines.
+
+    Returns a generator of (line number, raw line) pairs read straight from
+    the request stream, so the body is never buffered as a whole.
+    """
+    media_type = 'application/x-ndjson'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if stream is None:
+            return iter(())
+        return (
+            (lineno, line)
+            for lineno, line in enumerate(stream, start=1)
+            if line.strip()
+        )
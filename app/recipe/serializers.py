@@ -1,9 +1,90 @@
+from django.core.files.storage import default_storage
+from django.utils.functional import cached_property
+from django.db import transaction
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import extend_schema_field
 from rest_framework import serializers
 from core.models import Recipe, Tag, Ingredient
+from .bulk import get_or_create_by_name
 
 
-class IngredientSerializer(serializers.ModelSerializer):
+# Fields whose representation of a database value is the value itself.
+PLAIN_FIELDS = (serializers.IntegerField, serializers.CharField)
+
+
+class SparseFieldsMixin:
+    """Keep only the fields a view selected through ?fields= / ?omit=.
+
+    The selection in context['selected_fields'] applies to the top-level
+    objects only, not to nested serializers sharing the same context.
+    """
+
+    def get_fields(self):
+        fields = super().get_fields()
+        selected = self.context.get('selected_fields')
+        parent = self.parent
+        if isinstance(parent, serializers.ListSerializer):
+            parent = parent.parent
+        if selected is None or parent is not None:
+            return fields
+        return {name: fields[name] for name in selected if name in fields}
+
+
+class RowSerializerMixin(SparseFieldsMixin):
+    """Render .values() row dicts as well as model instances.
+
+    values_fields names the columns a list view selects; rows are rendered
+    by copying plain fields and converting only the rest, without the
+    attribute lookups of to_representation.
+    """
+    values_fields = ()
+    # Columns read by fields that are not columns themselves.
+    values_sources = {}
+
+    @classmethod
+    def row_columns(cls, selected=None):
+        """Return the columns needed to render the selected fields."""
+        if selected is None:
+            return list(cls.values_fields)
+        columns = []
+        for name in selected:
+            for column in cls.values_sources.get(name, (name,)):
+                if column not in columns:
+                    columns.append(column)
+        return columns
+
+    @cached_property
+    def _row_plan(self):
+        """Return (name, source, converter) for each readable field."""
+        plan = []
+        for name, field in self.fields.items():
+            if field.write_only:
+                continue
+            if isinstance(field, serializers.SerializerMethodField):
+                plan.append((name, None, getattr(self, field.method_name)))
+            elif type(field) in PLAIN_FIELDS:
+                plan.append((name, field.source, None))
+            else:
+                plan.append((name, field.source, field.to_representation))
+        return plan
+
+    def to_representation(self, instance):
+        if not isinstance(instance, dict):
+            return super().to_representation(instance)
+        ret = {}
+        for name, source, convert in self._row_plan:
+            if source is None:
+                ret[name] = convert(instance)
+            elif convert is None or instance[source] is None:
+                ret[name] = instance[source]
+            else:
+                ret[name] = convert(instance[source])
+        return ret
+
+
+class IngredientSerializer(RowSerializerMixin, serializers.ModelSerializer):
     """Serializer for ingredients."""
+    values_fields = ('id', 'name')
 
     class Meta:
         model = Ingredient
@@ -11,8 +92,9 @@ class IngredientSerializer(serializers.ModelSerializer):
         read_only_fields = ['id']
 
 
-class TagSerializer(serializers.ModelSerializer):
+class TagSerializer(RowSerializerMixin, serializers.ModelSerializer):
     """Serializer for tags."""
+    values_fields = ('id', 'name')
 
     class Meta:
         model = Tag
@@ -20,59 +102,95 @@ class TagSerializer(serializers.ModelSerializer):
         read_only_fields = ['id']
 
 
-class RecipeSerializer(serializers.ModelSerializer):
+class IngredientCountSerializer(IngredientSerializer):
+    """Serializer for ingredients with their recipe usage count."""
+    recipe_count = serializers.IntegerField(read_only=True)
+    values_fields = IngredientSerializer.values_fields + ('recipe_count',)
+
+    class Meta(IngredientSerializer.Meta):
+        fields = IngredientSerializer.Meta.fields + ['recipe_count']
+
+
+class TagCountSerializer(TagSerializer):
+    """Serializer for tags with their recipe usage count."""
+    recipe_count = serializers.IntegerField(read_only=True)
+    values_fields = TagSerializer.values_fields + ('recipe_count',)
+
+    class Meta(TagSerializer.Meta):
+        fields = TagSerializer.Meta.fields + ['recipe_count']
+
+
+@extend_schema_field(OpenApiTypes.OBJECT)
+class ImageRenditionsField(serializers.ReadOnlyField):
+    """Field rendering stored rendition paths as URLs."""
+
+    def to_representation(self, value):
+        request = self.context.get('request')
+        urls = {}
+        for size, formats in (value or {}).items():
+            urls[size] = {}
+            for fmt, path in formats.items():
+                url = default_storage.url(path)
+                if request is not None:
+                    url = request.build_absolute_uri(url)
+                urls[size][fmt] = url
+        return urls
+
+
+class RecipeSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer for recipes."""
     tags = TagSerializer(many=True, required=False)
     ingredients = IngredientSerializer(many=True, required=False)
+    image_renditions = ImageRenditionsField()
 
     class Meta:
         model = Recipe
         fields = [
             'id', 'title', 'time_minutes', 'price', 'link', 'tags',
-            'ingredients'
+            'ingredients', 'image_renditions'
         ]
         read_only_fields = ['id']
 
+    def _get_or_create_attrs(self, model, items):
+        """Return user's objects named in items, bulk creating missing."""
+        return list(get_or_create_by_name(
+            model,
+            self.context['request'].user,
+            (item['name'] for item in items),
+        ).values())
+
     def _get_or_create_tags(self, tags, recipe):
         """Handle getting or creating tags as needed."""
-        auth_user = self.context['request'].user
-        for tag in tags:
-            tag_obj, created = Tag.objects.get_or_create(
-                user=auth_user,
-                **tag,
-            )
-            recipe.tags.add(tag_obj)
+        recipe.tags.set(self._get_or_create_attrs(Tag, tags))
 
     def _get_or_create_ingredients(self, ingredients, recipe):
         """Handle getting or creating ingredients as needed."""
-        auth_user = self.context['request'].user
-        for ingredient in ingredients:
-            ingredient_obj, created = Ingredient.objects.get_or_create(
-                user=auth_user,
-                **ingredient,
-            )
-            recipe.ingredients.add(ingredient_obj)
+        recipe.ingredients.set(
+            self._get_or_create_attrs(Ingredient, ingredients)
+        )
 
+    @transaction.atomic
     def create(self, validated_data):
         """Create a recipe."""
         tags = validated_data.pop('tags', [])
         ingredients = validated_data.pop('ingredients', [])
         recipe = Recipe.objects.create(**validated_data)
-        self._get_or_create_tags(tags, recipe)
-        self._get_or_create_ingredients(ingredients, recipe)
+        if tags:
+            self._get_or_create_tags(tags, recipe)
+        if ingredients:
+            self._get_or_create_ingredients(ingredients, recipe)
         return recipe
 
+    @transaction.atomic
     def update(self, instance, validated_data):
         """Update recipe."""
         tags = validated_data.pop('tags', None)
-        ingredients = validated_data.pop('ingredients', [])
+        ingredients = validated_data.pop('ingredients', None)
 
         if tags is not None:
-            instance.tags.clear()
             self._get_or_create_tags(tags, instance)
 
         if ingredients is not None:
-            instance.ingredients.clear()
             self._get_or_create_ingredients(ingredients, instance)
 
         for attr, value in validated_data.items():
@@ -82,6 +200,36 @@ class RecipeSerializer(serializers.ModelSerializer):
         return instance
 
 
+class RecipeSummarySerializer(RowSerializerMixin, RecipeSerializer):
+    """Serializer listing recipes from their stored summary."""
+    tags = serializers.SerializerMethodField()
+    ingredients = serializers.SerializerMethodField()
+    values_fields = (
+        'id', 'title', 'time_minutes', 'price', 'link', 'image_renditions',
+        'current_summary',
+    )
+    values_sources = {
+        'tags': ('current_summary',), 'ingredients': ('current_summary',),
+    }
+
+    def _from_summary(self, recipe, field, serializer_class):
+        """Return the stored items, or serialize them if not stored yet."""
+        if isinstance(recipe, dict):
+            # Rows come from core.summary.with_current_summaries.
+            return recipe['current_summary'][field]
+        if recipe.summary is not None:
+            return recipe.summary[field]
+        return serializer_class(getattr(recipe, field).all(), many=True).data
+
+    @extend_schema_field(TagSerializer(many=True))
+    def get_tags(self, recipe):
+        return self._from_summary(recipe, 'tags', TagSerializer)
+
+    @extend_schema_field(IngredientSerializer(many=True))
+    def get_ingredients(self, recipe):
+        return self._from_summary(recipe, 'ingredients', IngredientSerializer)
+
+
 class RecipeDetailSerializer(RecipeSerializer):
     """Serializer for recipe detail view."""
 
@@ -91,9 +239,29 @@ class RecipeDetailSerializer(RecipeSerializer):
 
 class RecipeImageSerializer(serializers.ModelSerializer):
     """Serializer for uploading images to recipes."""
+    image_renditions = ImageRenditionsField()
 
     class Meta:
         model = Recipe
-        fields = ['id', 'image']
+        fields = ['id', 'image', 'image_renditions']
         read_only_fields = ['id']
         extra_kwargs = {'image': {'required': 'True'}}
+
+
+class RecipeImportErrorSerializer(serializers.Serializer):
+    """Serializer for a rejected row of a recipe import."""
+    line = serializers.IntegerField()
+    errors = serializers.DictField()
+
+
+class RecipeImportSerializer(serializers.Serializer):
+    """Serializer for the summary of a recipe import."""
+    created = serializers.IntegerField()
+    failed = serializers.IntegerField()
+    errors = RecipeImportErrorSerializer(many=True)
+
+
+class RecipeBatchSerializer(serializers.Serializer):
+    """Serializer for recipes retrieved in one batch."""
+    results = serializers.DictField(child=RecipeDetailSerializer())
+    missing = serializers.ListField(child=serializers.IntegerField())
@@ -2,19 +2,39 @@
 Test for recipe APIs
 """
 from decimal import Decimal
+import csv
+import io
+import json
+from django.core.cache import caches
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.contrib.auth import get_user_model
 from rest_framework.test import APIClient
 from rest_framework import status
 from core.models import Recipe, Tag, Ingredient
+from core.summary import with_current_summaries
+from recipe.images import (
+    RENDITION_FORMATS,
+    RENDITION_SIZES,
+    generate_renditions,
+    rendition_path,
+)
 from recipe.serializers import (RecipeSerializer,
-                                RecipeDetailSerializer)
+                                RecipeDetailSerializer,
+                                RecipeSummarySerializer)
 import os
 import tempfile
 from PIL import Image
+from unittest.mock import patch
 
 RECIPES_URL = reverse('recipe:recipe-list')
+IMPORT_URL = reverse('recipe:recipe-bulk-import')
+EXPORT_URL = reverse('recipe:recipe-export')
+BATCH_URL = reverse('recipe:recipe-batch')
 
 
 def recipe_detail_url(recipe_id):
@@ -76,7 +96,7 @@ class PrivateRecipeApiTests(TestCase):
         recipes = Recipe.objects.all().order_by('-id')
         serializer = RecipeSerializer(recipes, many=True)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data['results'], serializer.data)
 
     def test_recipe_list_only_authenticated_user(self) -> None:
         """Test list of recipes is limited to authenticated user."""
@@ -90,7 +110,7 @@ class PrivateRecipeApiTests(TestCase):
         recipes = Recipe.objects.filter(user=self.user).order_by('-id')
         serializer = RecipeSerializer(recipes, many=True)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data['results'], serializer.data)
 
     def test_get_recipe_detail(self) -> None:
         recipe = create_recipe(user=self.user)
@@ -365,6 +385,59 @@ class PrivateRecipeApiTests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         self.assertEqual(recipe.ingredients.count(), 0)
 
+    def test_create_recipe_nested_constant_queries(self):
+        """Test nested tag/ingredient writes don't scale with item count."""
+        def post_recipe(count):
+            payload = {
+                'title': f'Recipe with {count} items',
+                'time_minutes': 10,
+                'price': Decimal('1.00'),
+                'tags': [{'name': f'Tag {i}'} for i in range(count)],
+                'ingredients': [
+                    {'name': f'Ing {i}'} for i in range(count)
+                ],
+            }
+            with CaptureQueriesContext(connection) as ctx:
+                res = self.client.post(RECIPES_URL, payload, format='json')
+            self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+            return len(ctx.captured_queries)
+
+        self.assertEqual(post_recipe(2), post_recipe(30))
+        recipe = Recipe.objects.get(title='Recipe with 30 items')
+        self.assertEqual(recipe.tags.count(), 30)
+        self.assertEqual(recipe.ingredients.count(), 30)
+        self.assertEqual(Tag.objects.filter(user=self.user).count(), 30)
+
+    def test_update_recipe_tags_diffs_current_set(self):
+        """Test updating tags keeps links that are still requested."""
+        tag_keep = Tag.objects.create(user=self.user, name='Keep')
+        tag_drop = Tag.objects.create(user=self.user, name='Drop')
+        recipe = create_recipe(user=self.user)
+        recipe.tags.add(tag_keep, tag_drop)
+        through = Recipe.tags.through
+        link = through.objects.get(recipe=recipe, tag=tag_keep)
+
+        payload = {'tags': [{'name': 'Keep'}, {'name': 'New'}]}
+        url = recipe_detail_url(recipe.id)
+        res = self.client.patch(url, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(through.objects.filter(id=link.id).exists())
+        names = set(recipe.tags.values_list('name', flat=True))
+        self.assertEqual(names, {'Keep', 'New'})
+
+    def test_partial_update_keeps_ingredients(self):
+        """Test patching other fields leaves ingredients untouched."""
+        ingredient = Ingredient.objects.create(user=self.user, name='Salt')
+        recipe = create_recipe(user=self.user)
+        recipe.ingredients.add(ingredient)
+
+        url = recipe_detail_url(recipe.id)
+        res = self.client.patch(url, {'title': 'Renamed'}, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn(ingredient, recipe.ingredients.all())
+
     def test_filter_by_tags(self):
         """Test filtering recipes by tags."""
         r1 = create_recipe(user=self.user, title='Thai Vegetable Curry')
@@ -381,9 +454,9 @@ class PrivateRecipeApiTests(TestCase):
         s1 = RecipeSerializer(r1)
         s2 = RecipeSerializer(r2)
         s3 = RecipeSerializer(r3)
-        self.assertIn(s1.data, res.data)
-        self.assertIn(s2.data, res.data)
-        self.assertNotIn(s3.data, res.data)
+        self.assertIn(s1.data, res.data['results'])
+        self.assertIn(s2.data, res.data['results'])
+        self.assertNotIn(s3.data, res.data['results'])
 
     def test_filter_by_ingredients(self):
         """Test filtering recipes by ingredients."""
@@ -401,9 +474,369 @@ class PrivateRecipeApiTests(TestCase):
         s1 = RecipeSerializer(r1)
         s2 = RecipeSerializer(r2)
         s3 = RecipeSerializer(r3)
-        self.assertIn(s1.data, res.data)
-        self.assertIn(s2.data, res.data)
-        self.assertNotIn(s3.data, res.data)
+        self.assertIn(s1.data, res.data['results'])
+        self.assertIn(s2.data, res.data['results'])
+        self.assertNotIn(s3.data, res.data['results'])
+
+    def test_filter_by_tags_no_duplicates(self):
+        """Test a recipe matching several tags is returned once."""
+        recipe = create_recipe(user=self.user)
+        tag1 = Tag.objects.create(user=self.user, name='Vegan')
+        tag2 = Tag.objects.create(user=self.user, name='Quick')
+        recipe.tags.add(tag1, tag2)
+
+        params = {'tags': f'{tag1.id},{tag2.id}'}
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.get(RECIPES_URL, params)
+
+        self.assertEqual(len(res.data['results']), 1)
+        self.assertFalse(any(
+            'DISTINCT' in query['sql'] for query in ctx.captured_queries
+        ))
+
+    def test_filter_by_all_tags(self):
+        """Test match=all returns only recipes having every tag."""
+        tag1 = Tag.objects.create(user=self.user, name='Vegan')
+        tag2 = Tag.objects.create(user=self.user, name='Quick')
+        both = create_recipe(user=self.user, title='Both')
+        both.tags.add(tag1, tag2)
+        one = create_recipe(user=self.user, title='One')
+        one.tags.add(tag1)
+
+        params = {'tags': f'{tag1.id},{tag2.id}', 'match': 'all'}
+        res = self.client.get(RECIPES_URL, params)
+
+        ids = [r['id'] for r in res.data['results']]
+        self.assertEqual(ids, [both.id])
+
+    def test_filter_invalid_match(self):
+        """Test an unknown match mode is rejected."""
+        res = self.client.get(RECIPES_URL, {'match': 'some'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def _create_recipes_with_relations(self, count, start=0):
+        """Create recipes each having a tag and an ingredient."""
+        for i in range(start, start + count):
+            recipe = create_recipe(user=self.user, title=f'Recipe {i}')
+            recipe.tags.add(
+                Tag.objects.create(user=self.user, name=f'Tag {i}')
+            )
+            recipe.ingredients.add(
+                Ingredient.objects.create(user=self.user, name=f'Ing {i}')
+            )
+
+    def test_list_recipes_constant_queries(self):
+        """Test listing recipes does not issue a query per recipe."""
+        self._create_recipes_with_relations(2)
+        # Data version and the recipe page, relations come from summary.
+        with self.assertNumQueries(2):
+            res = self.client.get(RECIPES_URL)
+        self.assertEqual(len(res.data['results']), 2)
+
+        self._create_recipes_with_relations(10, start=2)
+        with self.assertNumQueries(2):
+            res = self.client.get(RECIPES_URL)
+        self.assertEqual(len(res.data['results']), 12)
+        self.assertEqual(len(res.data['results'][0]['tags']), 1)
+        self.assertEqual(len(res.data['results'][0]['ingredients']), 1)
+
+    def test_get_recipe_detail_constant_queries(self):
+        """Test retrieving a recipe prefetches its relations."""
+        recipe = create_recipe(user=self.user)
+        for i in range(5):
+            recipe.tags.add(
+                Tag.objects.create(user=self.user, name=f'Tag {i}')
+            )
+            recipe.ingredients.add(
+                Ingredient.objects.create(user=self.user, name=f'Ing {i}')
+            )
+
+        with self.assertNumQueries(4):
+            res = self.client.get(recipe_detail_url(recipe.id))
+        self.assertEqual(len(res.data['tags']), 5)
+        self.assertEqual(len(res.data['ingredients']), 5)
+
+    def test_list_recipes_paginated(self):
+        """Test recipes are returned in cursor pages, newest first."""
+        recipes = [
+            create_recipe(user=self.user, title=f'Recipe {i}')
+            for i in range(5)
+        ]
+
+        res = self.client.get(RECIPES_URL, {'page_size': 2})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIsNone(res.data['previous'])
+        ids = [r['id'] for r in res.data['results']]
+        self.assertEqual(ids, [recipes[4].id, recipes[3].id])
+
+        seen = list(ids)
+        while res.data['next']:
+            res = self.client.get(res.data['next'])
+            seen.extend(r['id'] for r in res.data['results'])
+        self.assertEqual(seen, [r.id for r in reversed(recipes)])
+
+    def test_list_recipes_deep_page_constant_queries(self):
+        """Test fetching a deep page costs the same as the first one."""
+        self._create_recipes_with_relations(6)
+
+        res = self.client.get(RECIPES_URL, {'page_size': 2})
+        res = self.client.get(res.data['next'])
+        with self.assertNumQueries(2):
+            res = self.client.get(res.data['next'])
+        self.assertEqual(len(res.data['results']), 2)
+        self.assertIsNone(res.data['next'])
+
+
+class BatchRetrieveTests(TestCase):
+    """Tests for retrieving several recipes at once."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            'user@example.com',
+            'password123',
+        )
+        self.client.force_authenticate(self.user)
+
+    def _create_recipes(self, count):
+        recipes = []
+        for i in range(count):
+            recipe = create_recipe(user=self.user, title=f'Recipe {i}')
+            recipe.tags.add(Tag.objects.create(user=self.user, name=f'T{i}'))
+            recipe.ingredients.add(
+                Ingredient.objects.create(user=self.user, name=f'I{i}')
+            )
+            recipes.append(recipe)
+        return recipes
+
+    def test_batch_matches_detail(self):
+        """Test each result is the recipe's detail representation."""
+        recipes = self._create_recipes(2)
+        ids = [recipes[1].id, recipes[0].id]
+
+        res = self.client.get(BATCH_URL, {'ids': f'{ids[0]},{ids[1]}'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(list(res.data['results']), [str(i) for i in ids])
+        for recipe in recipes:
+            detail = self.client.get(recipe_detail_url(recipe.id)).data
+            self.assertEqual(res.data['results'][str(recipe.id)], detail)
+        self.assertEqual(res.data['missing'], [])
+
+    def test_batch_constant_queries(self):
+        """Test the batch costs the same number of queries at any size."""
+        recipes = self._create_recipes(10)
+        ids = ','.join(str(recipe.id) for recipe in recipes)
+
+        # Data version, recipes and one prefetch per relation.
+        with self.assertNumQueries(4):
+            res = self.client.get(BATCH_URL, {'ids': ids})
+        self.assertEqual(len(res.data['results']), 10)
+
+    def test_batch_reports_missing_and_other_users(self):
+        """Test unknown and other users' IDs are reported, not returned."""
+        recipe = create_recipe(user=self.user)
+        other = create_recipe(user=get_user_model().objects.create_user(
+            'other@example.com', 'password123',
+        ))
+
+        res = self.client.get(
+            BATCH_URL, {'ids': f'{recipe.id},{other.id},999999'},
+        )
+
+        self.assertEqual(list(res.data['results']), [str(recipe.id)])
+        self.assertEqual(res.data['missing'], [other.id, 999999])
+
+    def test_batch_sparse_fields(self):
+        """Test fields= applies to each result."""
+        recipe = create_recipe(user=self.user)
+
+        res = self.client.get(
+            BATCH_URL, {'ids': recipe.id, 'fields': 'title'},
+        )
+
+        self.assertEqual(
+            res.data['results'], {str(recipe.id): {'title': recipe.title}},
+        )
+
+    def test_batch_invalid_ids(self):
+        """Test missing, malformed and too many IDs are rejected."""
+        too_many = ','.join(str(i) for i in range(1, 102))
+        for params in ({}, {'ids': '1,x'}, {'ids': too_many}):
+            res = self.client.get(BATCH_URL, params)
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertIn('ids', res.data)
+
+
+class SparseFieldsTests(TestCase):
+    """Tests for ?fields= and ?omit= on recipes."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            'user@example.com',
+            'password123',
+        )
+        self.client.force_authenticate(self.user)
+        self.recipe = create_recipe(user=self.user)
+        self.recipe.tags.add(Tag.objects.create(user=self.user, name='Vegan'))
+
+    def test_list_fields_narrows_select(self):
+        """Test fields= trims list items and the selected columns."""
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.get(RECIPES_URL, {'fields': 'id,title'})
+
+        self.assertEqual(res.data['results'], [
+            {'id': self.recipe.id, 'title': self.recipe.title},
+        ])
+        page_query = ctx.captured_queries[-1]['sql']
+        self.assertNotIn('"price"', page_query)
+        self.assertNotIn('"summary"', page_query)
+
+    def test_list_omit(self):
+        """Test omit= leaves fields out of list items."""
+        res = self.client.get(RECIPES_URL, {'omit': 'tags,ingredients'})
+
+        item = res.data['results'][0]
+        self.assertNotIn('tags', item)
+        self.assertNotIn('ingredients', item)
+        self.assertEqual(item['price'], '5.25')
+
+    def test_detail_fields_skips_prefetch(self):
+        """Test unselected relations are not prefetched on retrieve."""
+        url = recipe_detail_url(self.recipe.id)
+
+        # Data version and the recipe row only.
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.get(url, {'fields': 'title,description'})
+
+        self.assertEqual(len(ctx.captured_queries), 2)
+        self.assertNotIn('"price"', ctx.captured_queries[-1]['sql'])
+        self.assertEqual(set(res.data), {'title', 'description'})
+
+        res = self.client.get(url, {'fields': 'tags'})
+        self.assertEqual(res.data, {
+            'tags': [{'id': self.recipe.tags.get().id, 'name': 'Vegan'}],
+        })
+
+    def test_unknown_field_rejected(self):
+        """Test selecting a field the endpoint lacks is an error."""
+        res = self.client.get(RECIPES_URL, {'fields': 'id,secret'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('fields', res.data)
+
+    def test_fields_ignored_on_create(self):
+        """Test writes always return the full representation."""
+        payload = {'title': 'Soup', 'time_minutes': 5, 'price': '1.00'}
+
+        res = self.client.post(
+            f'{RECIPES_URL}?fields=id', payload, format='json',
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertIn('title', res.data)
+
+
+class RecipeSummaryTests(TestCase):
+    """Tests for the stored recipe summaries served by the list."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            'user@example.com',
+            'password123',
+        )
+        self.client.force_authenticate(self.user)
+
+    def _listed(self):
+        res = self.client.get(RECIPES_URL)
+        return json.loads(res.content)['results'][0]
+
+    def test_summary_matches_relations(self):
+        """Test listed tags and ingredients match the detail view."""
+        payload = {
+            'title': 'Curry',
+            'time_minutes': 30,
+            'price': Decimal('5.00'),
+            'tags': [{'name': 'Indian'}, {'name': 'Dinner'}],
+            'ingredients': [{'name': 'Rice'}],
+        }
+        res = self.client.post(RECIPES_URL, payload, format='json')
+        detail = self.client.get(recipe_detail_url(res.data['id'])).data
+
+        listed = self._listed()
+        self.assertEqual(
+            sorted(listed['tags'], key=lambda t: t['id']),
+            sorted(detail['tags'], key=lambda t: t['id']),
+        )
+        self.assertEqual(listed['ingredients'], detail['ingredients'])
+
+    def test_summary_follows_updates(self):
+        """Test link changes, renames and deletes reach the summary."""
+        recipe = create_recipe(user=self.user)
+        tag = Tag.objects.create(user=self.user, name='Vegan')
+        ingredient = Ingredient.objects.create(user=self.user, name='Tofu')
+        recipe.tags.add(tag)
+        ingredient.recipe_set.add(recipe)
+        self.assertEqual(self._listed()['tags'], [
+            {'id': tag.id, 'name': 'Vegan'},
+        ])
+        self.assertEqual(self._listed()['ingredients'], [
+            {'id': ingredient.id, 'name': 'Tofu'},
+        ])
+
+        tag.name = 'Plant based'
+        tag.save()
+        self.assertEqual(self._listed()['tags'][0]['name'], 'Plant based')
+
+        ingredient.delete()
+        self.assertEqual(self._listed()['ingredients'], [])
+
+        tag.recipe_set.clear()
+        self.assertEqual(self._listed()['tags'], [])
+
+    def test_rows_render_like_instances(self):
+        """Test .values() rows render exactly as model instances do."""
+        recipe = create_recipe(user=self.user, price=Decimal('5.10'))
+        recipe.tags.add(Tag.objects.create(user=self.user, name='Vegan'))
+        recipe.image_renditions = {'thumbnail': {'webp': 'uploads/t.webp'}}
+        recipe.save()
+        recipe.refresh_from_db()
+        row = with_current_summaries(Recipe.objects).values(
+            *RecipeSummarySerializer.values_fields
+        ).get(pk=recipe.pk)
+
+        self.assertEqual(
+            RecipeSummarySerializer(row).data,
+            RecipeSummarySerializer(recipe).data,
+        )
+
+    def test_missing_summary_falls_back_to_relations(self):
+        """Test recipes without a stored summary still list relations."""
+        recipe = create_recipe(user=self.user)
+        recipe.tags.add(Tag.objects.create(user=self.user, name='Vegan'))
+        Recipe.objects.filter(pk=recipe.pk).update(summary=None)
+
+        self.assertEqual(self._listed()['tags'][0]['name'], 'Vegan')
+
+    def test_missing_summaries_computed_in_list_query(self):
+        """Test a page of recipes without summaries takes no extra queries."""
+        names = ['Vegan', 'Quick', 'Dinner']
+        for name in names:
+            recipe = create_recipe(user=self.user)
+            recipe.tags.add(Tag.objects.create(user=self.user, name=name))
+        Recipe.objects.update(summary=None)
+
+        # Data version lookup plus the recipe page.
+        with self.assertNumQueries(2):
+            res = self.client.get(RECIPES_URL)
+
+        results = json.loads(res.content)['results']
+        self.assertEqual([r['tags'][0]['name'] for r in results],
+                         names[::-1])
 
 
 class ImageUploadTests(TestCase):
@@ -419,6 +852,10 @@ class ImageUploadTests(TestCase):
         self.recipe = create_recipe(user=self.user)
 
     def tearDown(self):
+        self.recipe.refresh_from_db()
+        for formats in self.recipe.image_renditions.values():
+            for path in formats.values():
+                default_storage.delete(path)
         self.recipe.image.delete()
 
     def test_upload_image(self):
@@ -436,6 +873,87 @@ class ImageUploadTests(TestCase):
         self.assertIn('image', res.data)
         self.assertTrue(os.path.exists(self.recipe.image.path))
 
+    @patch('recipe.views.schedule_renditions')
+    def test_upload_image_schedules_renditions(self, patched_schedule):
+        """Test uploading an image queues rendition generation."""
+        url = image_upload_url(self.recipe.id)
+        with tempfile.NamedTemporaryFile(suffix='.jpg') as image_file:
+            Image.new('RGB', (10, 10)).save(image_file, format='JPEG')
+            image_file.seek(0)
+            res = self.client.post(url, {'image': image_file},
+                                   format='multipart')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['image_renditions'], {})
+        patched_schedule.assert_called_once()
+        self.assertEqual(patched_schedule.call_args[0][0].id, self.recipe.id)
+
+    def test_generate_renditions(self):
+        """Test renditions are resized, stripped of EXIF and exposed."""
+        exif = Image.Exif()
+        exif[0x010f] = 'Test Camera'
+        image = Image.new('RGB', (1600, 1200))
+        buffer = io.BytesIO()
+        image.save(buffer, format='JPEG', exif=exif.tobytes())
+        self.recipe.image.save('photo.jpg', ContentFile(buffer.getvalue()))
+
+        generate_renditions(self.recipe.id, self.recipe.image.name)
+
+        self.recipe.refresh_from_db()
+        renditions = self.recipe.image_renditions
+        self.assertEqual(set(renditions), {'thumbnail', 'medium'})
+        for size, box in [('thumbnail', 200), ('medium', 800)]:
+            self.assertEqual(set(renditions[size]), {'webp', 'jpeg'})
+            for path in renditions[size].values():
+                with default_storage.open(path) as f, Image.open(f) as img:
+                    self.assertEqual(max(img.size), box)
+                    self.assertEqual(len(img.getexif()), 0)
+
+        res = self.client.get(recipe_detail_url(self.recipe.id))
+        url = res.data['image_renditions']['thumbnail']['webp']
+        self.assertTrue(url.startswith('http://testserver/static/media/'))
+        self.assertTrue(url.endswith('-thumbnail.webp'))
+
+    def test_generate_renditions_deletes_previous(self):
+        """Test the renditions of a replaced image are deleted."""
+        buffer = io.BytesIO()
+        Image.new('RGB', (300, 300)).save(buffer, format='JPEG')
+        self.recipe.image.save('old.jpg', ContentFile(buffer.getvalue()))
+        generate_renditions(self.recipe.id, self.recipe.image.name)
+        self.recipe.refresh_from_db()
+        previous = self.recipe.image_renditions
+        old_image = self.recipe.image.name
+
+        self.recipe.image.save('new.jpg', ContentFile(buffer.getvalue()))
+        generate_renditions(self.recipe.id, self.recipe.image.name, previous)
+
+        self.recipe.refresh_from_db()
+        for formats in previous.values():
+            for path in formats.values():
+                self.assertFalse(default_storage.exists(path))
+        for formats in self.recipe.image_renditions.values():
+            for path in formats.values():
+                self.assertTrue(default_storage.exists(path))
+        default_storage.delete(old_image)
+
+    def test_generate_renditions_for_replaced_image(self):
+        """Test renditions of an image replaced meanwhile are discarded."""
+        buffer = io.BytesIO()
+        Image.new('RGB', (300, 300)).save(buffer, format='JPEG')
+        self.recipe.image.save('old.jpg', ContentFile(buffer.getvalue()))
+        old_image = self.recipe.image.name
+        self.recipe.image.save('new.jpg', ContentFile(buffer.getvalue()))
+
+        generate_renditions(self.recipe.id, old_image)
+
+        self.recipe.refresh_from_db()
+        self.assertEqual(self.recipe.image_renditions, {})
+        for size in RENDITION_SIZES:
+            for fmt in RENDITION_FORMATS:
+                path = rendition_path(old_image, size, fmt)
+                self.assertFalse(default_storage.exists(path))
+        default_storage.delete(old_image)
+
     def test_upload_image_bad_request(self):
         """Test uploading an invalid image."""
         url = image_upload_url(self.recipe.id)
@@ -443,3 +961,328 @@ class ImageUploadTests(TestCase):
         res = self.client.post(url, payload, format='multipart')
 
         self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class RecipeImportTests(TestCase):
+    """Tests for the bulk recipe import API."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user(
+            email='user@example.com',
+            password='testpass123',
+        )
+        self.client.force_authenticate(self.user)
+
+    def _post_ndjson(self, rows):
+        """Post rows (dicts or raw strings) as an NDJSON body."""
+        body = '\n'.join(
+            row if isinstance(row, str) else json.dumps(row)
+            for row in rows
+        )
+        return self.client.post(
+            IMPORT_URL, body, content_type='application/x-ndjson',
+        )
+
+    def test_import_recipes(self):
+        """Test importing recipes with nested tags and ingredients."""
+        existing = Tag.objects.create(user=self.user, name='Dinner')
+        rows = [
+            {
+                'title': f'Imported {i}',
+                'time_minutes': 10,
+                'price': '3.50',
+                'tags': [{'name': 'Dinner'}, {'name': 'Quick'}],
+                'ingredients': [{'name': 'Salt'}],
+            }
+            for i in range(5)
+        ]
+
+        with patch('recipe.bulk.IMPORT_CHUNK_SIZE', 2):
+            res = self._post_ndjson(rows)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['created'], 5)
+        self.assertEqual(res.data['failed'], 0)
+        recipes = Recipe.objects.filter(user=self.user)
+        self.assertEqual(recipes.count(), 5)
+        self.assertEqual(Tag.objects.filter(user=self.user).count(), 2)
+        self.assertEqual(Ingredient.objects.filter(user=self.user).count(), 1)
+        for recipe in recipes:
+            self.assertIn(existing, recipe.tags.all())
+            self.assertEqual(recipe.tags.count(), 2)
+            self.assertEqual(recipe.ingredients.count(), 1)
+        res = self.client.get(RECIPES_URL, {'search': 'salt'})
+        self.assertEqual(len(res.data['results']), 5)
+
+    def test_import_reports_row_errors(self):
+        """Test invalid rows are reported and valid rows still imported."""
+        rows = [
+            {'title': 'Good', 'time_minutes': 5, 'price': '1.00'},
+            '{not json',
+            {'title': 'Missing price', 'time_minutes': 5},
+            '',
+            {'title': 'Also good', 'time_minutes': 5, 'price': '2.00'},
+        ]
+
+        res = self._post_ndjson(rows)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['created'], 2)
+        self.assertEqual(res.data['failed'], 2)
+        self.assertEqual(
+            [error['line'] for error in res.data['errors']], [2, 3],
+        )
+        self.assertIn('price', res.data['errors'][1]['errors'])
+        self.assertEqual(Recipe.objects.filter(user=self.user).count(), 2)
+
+
+class RecipeExportTests(TestCase):
+    """Tests for the streaming recipe export API."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user(
+            email='user@example.com',
+            password='testpass123',
+        )
+        self.client.force_authenticate(self.user)
+        self.tag = Tag.objects.create(user=self.user, name='Vegan')
+        self.ingredient = Ingredient.objects.create(
+            user=self.user, name='Tofu',
+        )
+        self.recipes = []
+        for i in range(5):
+            recipe = create_recipe(user=self.user, title=f'Recipe {i}')
+            recipe.tags.add(self.tag)
+            recipe.ingredients.add(self.ingredient)
+            self.recipes.append(recipe)
+        other_user = create_user(
+            email='other@example.com',
+            password='testpass123',
+        )
+        create_recipe(user=other_user, title='Not mine')
+
+    def test_export_ndjson(self):
+        """Test exporting recipes as NDJSON across several chunks."""
+        with patch('recipe.bulk.EXPORT_CHUNK_SIZE', 2):
+            res = self.client.get(EXPORT_URL)
+            content = b''.join(res.streaming_content).decode()
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res['Content-Type'], 'application/x-ndjson')
+        rows = [json.loads(line) for line in content.splitlines()]
+        self.assertEqual(
+            [row['id'] for row in rows],
+            [recipe.id for recipe in reversed(self.recipes)],
+        )
+        for row in rows:
+            self.assertEqual(row['tags'], [{'id': self.tag.id,
+                                            'name': 'Vegan'}])
+            self.assertEqual(row['ingredients'][0]['name'], 'Tofu')
+            self.assertIn('description', row)
+
+    def test_export_pages_by_keyset(self):
+        """Test the export reads recipes in LIMITed pages, not one cursor."""
+        with patch('recipe.bulk.EXPORT_CHUNK_SIZE', 2), \
+                CaptureQueriesContext(connection) as ctx:
+            res = self.client.get(EXPORT_URL)
+            content = b''.join(res.streaming_content).decode()
+
+        self.assertEqual(len(content.splitlines()), 5)
+        pages = [
+            query['sql'] for query in ctx.captured_queries
+            if query['sql'].startswith('SELECT "core_recipe"."id"')
+        ]
+        self.assertEqual(len(pages), 3)
+        for sql in pages:
+            self.assertIn('LIMIT 2', sql)
+
+    def test_export_csv(self):
+        """Test exporting recipes as CSV."""
+        res = self.client.get(EXPORT_URL, {'output': 'csv'})
+        content = b''.join(res.streaming_content).decode()
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        rows = list(csv.DictReader(io.StringIO(content)))
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(rows[0]['title'], 'Recipe 4')
+        self.assertEqual(rows[0]['tags'], 'Vegan')
+        self.assertEqual(rows[0]['ingredients'], 'Tofu')
+
+    def test_export_unsupported_format(self):
+        """Test an unknown export format is rejected."""
+        res = self.client.get(EXPORT_URL, {'output': 'xml'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ConditionalRequestTests(TestCase):
+    """Tests for ETags and cached responses on recipe endpoints."""
+
+    def setUp(self):
+        caches['responses'].clear()
+        self.client = APIClient()
+        self.user = create_user(
+            email='user@example.com',
+            password='testpass123',
+        )
+        self.client.force_authenticate(self.user)
+        self.recipe = create_recipe(user=self.user)
+
+    def test_not_modified(self):
+        """Test a matching If-None-Match returns 304 without a query."""
+        res = self.client.get(RECIPES_URL)
+        etag = res['ETag']
+
+        # Only the data version is read.
+        with self.assertNumQueries(1):
+            res = self.client.get(RECIPES_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(res['ETag'], etag)
+
+    def test_weak_etag_not_modified(self):
+        """Test the weak ETag a gzipping proxy hands out still matches."""
+        etag = self.client.get(RECIPES_URL)['ETag']
+
+        res = self.client.get(
+            RECIPES_URL, HTTP_IF_NONE_MATCH=f'"other", W/{etag}',
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(res['ETag'], etag)
+
+    def test_cached_body_served(self):
+        """Test repeated requests are served from the response cache."""
+        res = self.client.get(recipe_detail_url(self.recipe.id))
+
+        with self.assertNumQueries(1):
+            cached = self.client.get(recipe_detail_url(self.recipe.id))
+
+        self.assertEqual(cached.status_code, status.HTTP_200_OK)
+        self.assertEqual(cached['ETag'], res['ETag'])
+        self.assertEqual(cached.json(), res.json())
+
+    def test_etag_varies_with_query_params(self):
+        """Test different filters produce different ETags."""
+        res1 = self.client.get(RECIPES_URL)
+        res2 = self.client.get(RECIPES_URL, {'page_size': 1})
+
+        self.assertNotEqual(res1['ETag'], res2['ETag'])
+
+    def test_write_changes_etag(self):
+        """Test updating a recipe invalidates the cached list."""
+        etag = self.client.get(RECIPES_URL)['ETag']
+
+        self.client.patch(
+            recipe_detail_url(self.recipe.id), {'title': 'Changed'},
+        )
+        res = self.client.get(RECIPES_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(res['ETag'], etag)
+        self.assertEqual(res.data['results'][0]['title'], 'Changed')
+
+    def test_m2m_change_changes_etag(self):
+        """Test linking a tag to a recipe invalidates cached responses."""
+        etag = self.client.get(RECIPES_URL)['ETag']
+        tag = Tag.objects.create(user=self.user, name='Vegan')
+        self.user.refresh_from_db()
+        version = self.user.data_version
+
+        self.recipe.tags.add(tag)
+
+        self.user.refresh_from_db()
+        self.assertGreater(self.user.data_version, version)
+        res = self.client.get(RECIPES_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['results'][0]['tags'][0]['name'], 'Vegan')
+
+    def test_tags_list_not_modified(self):
+        """Test tag lists support conditional requests."""
+        Tag.objects.create(user=self.user, name='Vegan')
+        url = reverse('recipe:tag-list')
+        etag = self.client.get(url)['ETag']
+
+        res = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+
+class RecipeSearchTests(TestCase):
+    """Tests for full-text recipe search."""
+
+    def setUp(self):
+        caches['responses'].clear()
+        self.client = APIClient()
+        self.user = create_user(
+            email='user@example.com',
+            password='testpass123',
+        )
+        self.client.force_authenticate(self.user)
+
+    def _search(self, term, **params):
+        res = self.client.get(RECIPES_URL, {'search': term, **params})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return res
+
+    def test_search_ranked_by_relevance(self):
+        """Test title matches rank above description/ingredient matches."""
+        by_ingredient = create_recipe(
+            user=self.user, title='Soup', description='Warm.',
+        )
+        by_ingredient.ingredients.add(
+            Ingredient.objects.create(user=self.user, name='Tomatoes'),
+        )
+        by_title = create_recipe(
+            user=self.user, title='Tomato salad', description='Fresh.',
+        )
+        create_recipe(user=self.user, title='Pancakes', description='Sweet.')
+
+        res = self._search('tomato')
+
+        ids = [r['id'] for r in res.data['results']]
+        self.assertEqual(ids, [by_title.id, by_ingredient.id])
+
+    def test_search_limited_to_user(self):
+        """Test search only returns the user's recipes."""
+        other = create_user(email='other@example.com', password='pass12345')
+        create_recipe(user=other, title='Tomato soup')
+
+        res = self._search('tomato')
+
+        self.assertEqual(res.data['results'], [])
+
+    def test_search_vector_follows_ingredient_changes(self):
+        """Test renaming and removing ingredients updates search."""
+        recipe = create_recipe(user=self.user, title='Stew')
+        ingredient = Ingredient.objects.create(user=self.user, name='Leek')
+        recipe.ingredients.add(ingredient)
+        self.assertEqual(len(self._search('leek').data['results']), 1)
+
+        ingredient.name = 'Fennel'
+        ingredient.save()
+        self.assertEqual(len(self._search('leek').data['results']), 0)
+        self.assertEqual(len(self._search('fennel').data['results']), 1)
+
+        ingredient.delete()
+        self.assertEqual(len(self._search('fennel').data['results']), 0)
+
+    def test_search_paginated_by_rank(self):
+        """Test paging through search results visits every match once."""
+        for i in range(5):
+            create_recipe(
+                user=self.user,
+                title='Curry ' + 'curry ' * i,
+                description='curry',
+            )
+
+        res = self._search('curry', page_size=2)
+        seen = [r['id'] for r in res.data['results']]
+        while res.data['next']:
+            res = self.client.get(res.data['next'])
+            seen.extend(r['id'] for r in res.data['results'])
+
+        self.assertEqual(len(seen), 5)
+        self.assertEqual(len(set(seen)), 5)
@@ -1,13 +1,29 @@
-from django.urls import (path, include)
+from django.conf import settings
+from django.urls import (path, include, URLPattern)
 from rest_framework.routers import DefaultRouter
+
+from core.async_views import async_view
 from . import views
 
+# Read-heavy routes served by async views in ASGI mode.
+ASYNC_ROUTES = {'recipe-list', 'recipe-detail', 'tag-list', 'ingredient-list'}
+
 router = DefaultRouter()
 router.register('recipes', views.RecipeViewSet)
 router.register('tags', views.TagViewSet)
 router.register('ingredients', views.IngredientViewSet)
 app_name = 'recipe'
 
+router_urls = router.urls
+if settings.SERVER_MODE == 'asgi':
+    router_urls = [
+        URLPattern(
+            pattern.pattern, async_view(pattern.callback),
+            pattern.default_args, pattern.name,
+        ) if pattern.name in ASYNC_ROUTES else pattern
+        for pattern in router_urls
+    ]
+
 urlpatterns = [
-    path('', include(router.urls))
+    path('', include(router_urls))
 ]
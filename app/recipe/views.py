@@ -1,10 +1,38 @@
+from django.conf import settings
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import IntegrityError, transaction
+from django.db.models import (
+    Count,
+    Exists,
+    F,
+    FloatField,
+    Func,
+    OuterRef,
+    Subquery,
+)
+from django.db.models.functions import Cast
+from django.http import StreamingHttpResponse
+from django.utils.translation import gettext_lazy as _
 from rest_framework import (viewsets, mixins, status)
-from rest_framework.authentication import TokenAuthentication
 from rest_framework.permissions import IsAuthenticated
 
 from . import serializers
+from .bulk import (
+    import_recipes,
+    export_recipes_ndjson,
+    export_recipes_csv,
+)
+from .caching import ConditionalCacheMixin
+from .images import schedule_renditions
+from .parsers import NDJSONParser
+from .pagination import RecipeCursorPagination, RecipeAttrCursorPagination
 from core.models import Recipe, Tag, Ingredient
+from core.search import SEARCH_CONFIG
+from core.summary import with_current_summaries
+from core.timeouts import set_request_timeout
+from user.authentication import CachedTokenAuthentication
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 from drf_spectacular.utils import (
     extend_schema_view,
@@ -14,6 +42,76 @@ from drf_spectacular.utils import (
 )
 
 
+FIELD_SELECTION_PARAMETERS = [
+    OpenApiParameter(
+        'fields',
+        OpenApiTypes.STR,
+        description='Comma separated list of fields to return',
+    ),
+    OpenApiParameter(
+        'omit',
+        OpenApiTypes.STR,
+        description='Comma separated list of fields to leave out',
+    ),
+]
+
+
+def _as_rows(queryset, serializer_class, selected=None):
+    """Select only what serializer_class renders, as .values() dicts.
+
+    The ordering columns are always kept, as cursor pagination reads them
+    from the rows.
+    """
+    fields = serializer_class.row_columns(selected)
+    for name in [
+        *(field.lstrip('-') for field in queryset.query.order_by),
+        *queryset.query.annotations,
+    ]:
+        if name not in fields:
+            fields.append(name)
+    return queryset.values(*fields)
+
+
+class FieldSelectionMixin:
+    """Let read requests choose fields with ?fields=/?omit=."""
+    field_selection_actions = ('list', 'retrieve')
+
+    def _split_param(self, name):
+        value = self.request.query_params.get(name, '')
+        return [field for field in value.split(',') if field]
+
+    def get_selected_fields(self):
+        """Return the requested field names in serializer order, or None."""
+        if not hasattr(self, '_selected_fields'):
+            self._selected_fields = self._select_fields()
+        return self._selected_fields
+
+    def _select_fields(self):
+        if self.action not in self.field_selection_actions:
+            return None
+        fields = self._split_param('fields')
+        omit = self._split_param('omit')
+        if not fields and not omit:
+            return None
+
+        available = list(self.get_serializer_class()().fields)
+        for param, names in (('fields', fields), ('omit', omit)):
+            unknown = [name for name in names if name not in available]
+            if unknown:
+                raise ValidationError({param: [
+                    _('Unknown field(s): %s.') % ', '.join(unknown),
+                ]})
+        return [
+            name for name in available
+            if (not fields or name in fields) and name not in omit
+        ]
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['selected_fields'] = self.get_selected_fields()
+        return context
+
+
 @extend_schema_view(
     list=extend_schema(
         parameters=[
@@ -27,39 +125,176 @@ from drf_spectacular.utils import (
                 OpenApiTypes.STR,
                 description='Comma separated list of ingredient IDs to filter',
             ),
+            OpenApiParameter(
+                'search',
+                OpenApiTypes.STR,
+                description=(
+                    'Full-text search over title, description and '
+                    'ingredient names; results are ordered by relevance'
+                ),
+            ),
+            OpenApiParameter(
+                'match',
+                OpenApiTypes.STR, enum=['any', 'all'],
+                description=(
+                    'Return recipes having any (default) or all of the '
+                    'requested tags and ingredients'
+                ),
+            ),
+            *FIELD_SELECTION_PARAMETERS,
         ]
     ),
+    retrieve=extend_schema(parameters=FIELD_SELECTION_PARAMETERS),
 )
-class RecipeViewSet(viewsets.ModelViewSet):
+class RecipeViewSet(FieldSelectionMixin,
+                    ConditionalCacheMixin,
+                    viewsets.ModelViewSet):
     """View for manage recipe APIs."""
     serializer_class = serializers.RecipeDetailSerializer
     queryset = Recipe.objects.all()
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [IsAuthenticated]
+    pagination_class = RecipeCursorPagination
+    field_selection_actions = ('list', 'retrieve', 'batch')
+    batch_max_ids = 100
 
     def _params_to_ints(self, qs):
         """Convert a list of strings to integers."""
         return [int(str_id) for str_id in qs.split(',')]
 
+    def _filter_by_related(self, queryset, field, ids, match_all):
+        """Filter recipes linked to any (or all) of the given object IDs.
+
+        Uses subqueries on the through table rather than joins, so recipes
+        are never duplicated and no DISTINCT is needed.
+        """
+        m2m_field = getattr(Recipe, field).field
+        through = m2m_field.remote_field.through
+        target = f'{m2m_field.m2m_reverse_field_name()}_id__in'
+        if match_all:
+            matching = (
+                through.objects.filter(**{target: ids})
+                .values('recipe_id')
+                .annotate(matched=Count('*'))
+                .filter(matched=len(set(ids)))
+                .values('recipe_id')
+            )
+            return queryset.filter(pk__in=matching)
+        return queryset.filter(Exists(
+            through.objects.filter(recipe_id=OuterRef('pk'), **{target: ids})
+        ))
+
     def get_queryset(self):
         """Retrieve recipes for authenticated user."""
         tags = self.request.query_params.get('tags')
         ingredients = self.request.query_params.get('ingredients')
+        search = self.request.query_params.get('search')
+        match = self.request.query_params.get('match', 'any')
+        if match not in ('any', 'all'):
+            raise ValidationError({'match': [_('Must be "any" or "all".')]})
         queryset = self.queryset
         if tags:
             tag_ids = self._params_to_ints(tags)
-            queryset = queryset.filter(tags__id__in=tag_ids)
+            queryset = self._filter_by_related(
+                queryset, 'tags', tag_ids, match == 'all',
+            )
         if ingredients:
             ingredient_ids = self._params_to_ints(ingredients)
-            queryset = queryset.filter(ingredients__id__in=ingredient_ids)
+            queryset = self._filter_by_related(
+                queryset, 'ingredients', ingredient_ids, match == 'all',
+            )
 
-        return queryset.filter(
-            user=self.request.user
-        ).order_by('-id').distinct()
+        queryset = queryset.filter(user=self.request.user).order_by('-id')
+        if search:
+            query = SearchQuery(
+                search, config=SEARCH_CONFIG, search_type='websearch',
+            )
+            queryset = queryset.filter(search_vector=query).annotate(
+                rank=Cast(SearchRank(F('search_vector'), query), FloatField()),
+            ).order_by('-rank', '-id')
+        selected = self.get_selected_fields()
+        if self.action == 'list':
+            if selected is None or {'tags', 'ingredients'} & set(selected):
+                queryset = with_current_summaries(queryset)
+            queryset = _as_rows(
+                queryset, self.get_serializer_class(), selected,
+            )
+        elif self.action in ('retrieve', 'batch'):
+            queryset = self._narrow_to(queryset, selected)
+
+        return queryset
+
+    def _narrow_to(self, queryset, selected):
+        """Load only the selected columns and prefetch only used relations."""
+        relations = ['tags', 'ingredients']
+        if selected is None:
+            return queryset.prefetch_related(*relations)
+        return queryset.only(*(
+            name for name in selected if name not in relations
+        )).prefetch_related(*(
+            name for name in relations if name in selected
+        ))
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+    def _batch_ids(self):
+        """Return the distinct IDs of ?ids=, in the order given."""
+        try:
+            ids = list(dict.fromkeys(
+                int(value) for value in
+                self.request.query_params.get('ids', '').split(',') if value
+            ))
+        except ValueError:
+            raise ValidationError({'ids': [_('Must be integers.')]})
+        if not ids:
+            raise ValidationError({'ids': [_('This parameter is required.')]})
+        if len(ids) > self.batch_max_ids:
+            raise ValidationError({'ids': [
+                _('At most %d IDs are allowed.') % self.batch_max_ids,
+            ]})
+        return ids
+
+    def _batch(self, request):
+        ids = self._batch_ids()
+        recipes = {
+            recipe.pk: recipe
+            for recipe in self.get_queryset().filter(pk__in=ids)
+        }
+        found = [recipes[pk] for pk in ids if pk in recipes]
+        data = self.get_serializer(found, many=True).data
+        return Response({
+            'results': {
+                str(recipe.pk): item for recipe, item in zip(found, data)
+            },
+            'missing': [pk for pk in ids if pk not in recipes],
+        })
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                'ids',
+                OpenApiTypes.STR, required=True,
+                description='Comma separated list of up to 100 recipe IDs',
+            ),
+            *FIELD_SELECTION_PARAMETERS,
+        ],
+        responses=serializers.RecipeBatchSerializer,
+    )
+    @action(methods=['GET'], detail=False, url_path='batch')
+    def batch(self, request):
+        """Retrieve several recipes at once, keyed by ID.
+
+        IDs that do not exist or belong to another user are both listed in
+        missing, as retrieve answers 404 for either.
+        """
+        return self._cached_response(self._batch, request)
 
     def get_serializer_class(self):
         if self.action == 'list':
-            return serializers.RecipeSerializer
+            return serializers.RecipeSummarySerializer
         elif self.action == 'upload_image':
             return serializers.RecipeImageSerializer
 
@@ -76,11 +311,87 @@ class RecipeViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(recipe, data=request.data)
 
         if serializer.is_valid():
-            serializer.save()
+            previous = recipe.image_renditions
+            recipe = serializer.save(image_renditions={})
+            schedule_renditions(recipe, previous)
             return Response(serializer.data, status=status.HTTP_200_OK)
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    @extend_schema(
+        request={NDJSONParser.media_type: serializers.RecipeDetailSerializer},
+        responses=serializers.RecipeImportSerializer,
+    )
+    @action(methods=['POST'], detail=False, url_path='import',
+            parser_classes=[NDJSONParser])
+    def bulk_import(self, request):
+        """Import recipes from a newline-delimited JSON stream."""
+        set_request_timeout(settings.BULK_REQUEST_TIMEOUT)
+        summary = import_recipes(
+            request.data,
+            self.get_serializer_class(),
+            self.get_serializer_context(),
+        )
+        return Response(summary, status=status.HTTP_200_OK)
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                'output',
+                OpenApiTypes.STR, enum=['ndjson', 'csv'],
+                description='Export format, defaults to ndjson.',
+            ),
+            OpenApiParameter(
+                'tags',
+                OpenApiTypes.STR,
+                description='Comma separated list of tag IDs to filter',
+            ),
+            OpenApiParameter(
+                'ingredients',
+                OpenApiTypes.STR,
+                description='Comma separated list of ingredient IDs to filter',
+            ),
+            OpenApiParameter(
+                'search',
+                OpenApiTypes.STR,
+                description='Full-text search, ordered by relevance',
+            ),
+            OpenApiParameter(
+                'match',
+                OpenApiTypes.STR, enum=['any', 'all'],
+                description='Match any (default) or all tags/ingredients',
+            ),
+        ],
+        responses={200: OpenApiTypes.BINARY},
+    )
+    @action(methods=['GET'], detail=False, url_path='export')
+    def export(self, request):
+        """Stream all of the user's recipes as NDJSON or CSV."""
+        output = request.query_params.get('output', 'ndjson')
+        exporters = {
+            'ndjson': (export_recipes_ndjson, 'application/x-ndjson'),
+            'csv': (export_recipes_csv, 'text/csv'),
+        }
+        if output not in exporters:
+            return Response(
+                {'output': [f'Unsupported export format "{output}".']},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        exporter, content_type = exporters[output]
+        set_request_timeout(settings.BULK_REQUEST_TIMEOUT)
+        response = StreamingHttpResponse(
+            exporter(
+                self.get_queryset(),
+                self.get_serializer_class(),
+                self.get_serializer_context(),
+            ),
+            content_type=content_type,
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="recipes.{output}"'
+        )
+        return response
+
 
 @extend_schema_view(
     list=extend_schema(
@@ -90,38 +401,96 @@ class RecipeViewSet(viewsets.ModelViewSet):
                 OpenApiTypes.INT, enum=[0, 1],
                 description='Filter by items assigned to recipes.',
             ),
+            OpenApiParameter(
+                'with_counts',
+                OpenApiTypes.INT, enum=[0, 1],
+                description='Include the number of recipes using each item.',
+            ),
+            *FIELD_SELECTION_PARAMETERS,
         ]
     )
 )
-class BaseRecipeAttrViewSet(mixins.DestroyModelMixin,
+class BaseRecipeAttrViewSet(FieldSelectionMixin,
+                            ConditionalCacheMixin,
+                            mixins.DestroyModelMixin,
                             mixins.UpdateModelMixin,
                             mixins.ListModelMixin,
                             viewsets.GenericViewSet):
     """Base viewset for recipe attributes."""
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [IsAuthenticated]
+    pagination_class = RecipeAttrCursorPagination
+
+    def _recipe_links(self):
+        """Return the through rows linking recipes to the outer object."""
+        m2m_field = Recipe._meta.get_field(self.recipe_field)
+        return m2m_field.remote_field.through.objects.filter(**{
+            f'{m2m_field.m2m_reverse_field_name()}_id': OuterRef('pk'),
+        })
+
+    def _flag_param(self, name):
+        """Return the 0/1 query parameter name as a bool."""
+        value = self.request.query_params.get(name, '0')
+        if value not in ('0', '1'):
+            raise ValidationError({name: [_('Must be 0 or 1.')]})
+        return value == '1'
+
+    def _with_counts(self):
+        """Return whether recipe usage counts were requested."""
+        return self._flag_param('with_counts')
 
     def get_queryset(self):
         """Filter queryset to authenticated user."""
-        assigned_only = bool(
-            int(self.request.query_params.get('assigned_only', 0))
-        )
+        assigned_only = self._flag_param('assigned_only')
         queryset = self.queryset
         if assigned_only:
-            queryset = queryset.filter(recipe__isnull=False)
+            queryset = queryset.filter(Exists(self._recipe_links()))
+        selected = self.get_selected_fields()
+        if self.action == 'list' and self._with_counts() and (
+            selected is None or 'recipe_count' in selected
+        ):
+            # COUNT as a plain Func so the subquery isn't grouped and always
+            # returns exactly one row.
+            counts = self._recipe_links().annotate(
+                total=Func('pk', function='COUNT'),
+            ).values('total')
+            queryset = queryset.annotate(recipe_count=Subquery(counts))
 
-        return queryset.filter(
+        queryset = queryset.filter(
             user=self.request.user
-        ).order_by('-name').distinct()
+        ).order_by('-name', 'id')
+        if self.action == 'list':
+            queryset = _as_rows(
+                queryset, self.get_serializer_class(), selected,
+            )
+        return queryset
+
+    def get_serializer_class(self):
+        if self.action == 'list' and self._with_counts():
+            return self.count_serializer_class
+        return self.serializer_class
+
+    def perform_update(self, serializer):
+        """Update the object, rejecting names the user already has."""
+        try:
+            with transaction.atomic():
+                serializer.save()
+        except IntegrityError:
+            msg = _('An item with this name already exists.')
+            raise ValidationError({'name': [msg]})
 
 
 class TagViewSet(BaseRecipeAttrViewSet):
     """Manage tags in the database."""
     serializer_class = serializers.TagSerializer
+    count_serializer_class = serializers.TagCountSerializer
     queryset = Tag.objects.all()
+    recipe_field = 'tags'
 
 
 class IngredientViewSet(BaseRecipeAttrViewSet):
     """Manage ingredients in the database."""
     serializer_class = serializers.IngredientSerializer
+    count_serializer_class = serializers.IngredientCountSerializer
     queryset = Ingredient.objects.all()
+    recipe_field = 'ingredients'
@@ -1,6 +1,22 @@
 from django.apps import AppConfig
+from django.conf import settings
+from django.db.models.signals import post_save, post_delete
 
 
 class UserConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'user'
+
+    def ready(self):
+        from rest_framework.authtoken.models import Token
+
+        from . import authentication
+
+        post_delete.connect(
+            authentication.invalidate_deleted_token, sender=Token,
+        )
+        for signal in (post_save, post_delete):
+            signal.connect(
+                authentication.invalidate_changed_user,
+                sender=settings.AUTH_USER_MODEL,
+            )
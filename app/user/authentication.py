@@ -0,0 +1,119 @@
+"""
+Authentication classes for the API.
+"""
+import hashlib
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import router
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+
+def _cache():
+    """Return the cache holding token and user snapshots."""
+    return caches[settings.AUTH_TOKEN_CACHE_ALIAS]
+
+
+def token_cache_key(key):
+    """Return the cache key for a token, without exposing the token."""
+    digest = hashlib.sha256(key.encode()).hexdigest()
+    return f'auth-token:{digest}'
+
+
+def user_cache_key(user_id):
+    """Return the cache key for the snapshot of a user."""
+    return f'auth-user:{user_id}'
+
+
+def invalidate_token(key):
+    """Drop a cached token-to-user_id mapping."""
+    _cache().delete(token_cache_key(key))
+
+
+def invalidate_users(user_ids):
+    """Drop the cached snapshots of users.
+
+    Saving or deleting a user does this through signals; call it after
+    changing users with QuerySet.update(), e.g. a bulk deactivation.
+    """
+    _cache().delete_many([user_cache_key(pk) for pk in user_ids])
+
+
+def snapshot_user(user):
+    """Return the user's loaded fields, without the password hash."""
+    return {
+        field.attname: getattr(user, field.attname)
+        for field in user._meta.concrete_fields
+        if field.attname != 'password'
+        and field.attname not in user.get_deferred_fields()
+    }
+
+
+def user_from_snapshot(snapshot):
+    """Return a User built from snapshot_user's output.
+
+    Fields left out of the snapshot are deferred: reading them costs a
+    query, and save() only writes the loaded fields.
+    """
+    model = get_user_model()
+    return model.from_db(
+        router.db_for_read(model), list(snapshot), list(snapshot.values()),
+    )
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """Token authentication served from cached token and user snapshots.
+
+    A token maps to its user's id, and each user to a snapshot of their
+    fields without the password hash, so a request with a cached token
+    makes no queries. Entries expire after the cache alias' TIMEOUT; the
+    token's is dropped when the token is deleted and the user's when the
+    user is saved or deleted (see invalidate_users for bulk updates).
+    With a per-process cache such as LocMemCache, other workers only see
+    a change once the entry expires; use a shared cache to invalidate
+    everywhere at once.
+    """
+
+    def authenticate_credentials(self, key):
+        cache = _cache()
+        token_key = token_cache_key(key)
+        user_id = cache.get(token_key)
+        if user_id is None:
+            try:
+                token = Token.objects.select_related('user').get(key=key)
+            except Token.DoesNotExist:
+                raise exceptions.AuthenticationFailed(_('Invalid token.'))
+            user = token.user
+            cache.set_many({
+                token_key: user.pk,
+                user_cache_key(user.pk): snapshot_user(user),
+            })
+        else:
+            snapshot = cache.get(user_cache_key(user_id))
+            if snapshot is None:
+                user = get_user_model().objects.filter(pk=user_id).first()
+                if user is not None:
+                    cache.set(user_cache_key(user_id), snapshot_user(user))
+            else:
+                user = user_from_snapshot(snapshot)
+
+        if user is None or not user.is_active:
+            raise exceptions.AuthenticationFailed(
+                _('User inactive or deleted.')
+            )
+
+        return (user, key)
+
+
+def invalidate_deleted_token(sender, instance, **kwargs):
+    """Signal handler dropping the cache entry of a deleted token."""
+    invalidate_token(instance.key)
+
+
+def invalidate_changed_user(sender, instance, **kwargs):
+    """Signal handler dropping the snapshot of a saved or deleted user."""
+    invalidate_users([instance.pk])
@@ -0,0 +1,206 @@
+"""
+Password hashers with tunable cost, run on a bounded thread pool.
+"""
+import base64
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import (
+    Argon2PasswordHasher,
+    BasePasswordHasher,
+    PBKDF2PasswordHasher,
+    mask_hash,
+)
+from django.utils.crypto import constant_time_compare
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import Throttled
+
+_executor = None
+_slots = None
+_lock = threading.Lock()
+_local = threading.local()
+
+
+class PasswordHashingBusy(Throttled):
+    """Raised when too many passwords are already waiting to be hashed."""
+    default_detail = _('Too many logins in progress, try again shortly.')
+
+
+def get_executor():
+    """Return the process-wide pool hashing passwords.
+
+    Created lazily so that a pre-forking server starts it in each worker
+    rather than in the master.
+    """
+    global _executor, _slots
+    with _lock:
+        if _executor is None:
+            _slots = threading.BoundedSemaphore(
+                settings.PASSWORD_HASH_THREADS + settings.PASSWORD_HASH_QUEUE
+            )
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.PASSWORD_HASH_THREADS,
+                thread_name_prefix='password-hash',
+                initializer=setattr, initargs=(_local, 'in_pool', True),
+            )
+    return _executor
+
+
+def shutdown_executor(wait=True):
+    """Stop the hashing pool; the next hash starts a new one."""
+    global _executor
+    with _lock:
+        if _executor is not None:
+            _executor.shutdown(wait=wait)
+            _executor = None
+
+
+def run_hashing(func, *args):
+    """Run func on the hashing pool and return its result.
+
+    At most PASSWORD_HASH_THREADS hashes run at once per process, so a
+    burst of logins cannot take every core from other requests; callers
+    beyond the PASSWORD_HASH_QUEUE waiting ones get PasswordHashingBusy.
+    """
+    if getattr(_local, 'in_pool', False):
+        return func(*args)
+    executor = get_executor()
+    if not _slots.acquire(timeout=settings.PASSWORD_HASH_WAIT):
+        raise PasswordHashingBusy(wait=settings.PASSWORD_HASH_WAIT)
+    try:
+        return executor.submit(func, *args).result()
+    finally:
+        _slots.release()
+
+
+class PooledHasherMixin:
+    """Run a hasher's encode and verify on the hashing pool."""
+
+    def encode(self, password, salt, *args, **kwargs):
+        return run_hashing(
+            lambda: super(PooledHasherMixin, self).encode(
+                password, salt, *args, **kwargs
+            )
+        )
+
+    def verify(self, password, encoded):
+        return run_hashing(
+            lambda: super(PooledHasherMixin, self).verify(password, encoded)
+        )
+
+
+class TunedArgon2PasswordHasher(PooledHasherMixin, Argon2PasswordHasher):
+    """Argon2id with costs from the ARGON2_* settings.
+
+    Hashes made with other costs are upgraded on the next login.
+    """
+
+    @property
+    def time_cost(self):
+        return settings.ARGON2_TIME_COST
+
+    @property
+    def memory_cost(self):
+        return settings.ARGON2_MEMORY_COST
+
+    @property
+    def parallelism(self):
+        return settings.ARGON2_PARALLELISM
+
+
+class ScryptPasswordHasher(BasePasswordHasher):
+    """Backport of Django 4.0's scrypt hasher, using the same format."""
+    algorithm = 'scrypt'
+    block_size = 8
+    maxmem = 0
+    parallelism = 1
+    work_factor = 2 ** 14
+
+    def encode(self, password, salt, n=None, r=None, p=None):
+        assert password is not None
+        assert salt and '$' not in salt
+        n = n or self.work_factor
+        r = r or self.block_size
+        p = p or self.parallelism
+        hash_ = hashlib.scrypt(
+            password.encode(), salt=salt.encode(), n=n, r=r, p=p,
+            maxmem=self.get_maxmem(n, r, p), dklen=64,
+        )
+        hash_ = base64.b64encode(hash_).decode('ascii')
+        return '%s$%d$%s$%d$%d$%s' % (self.algorithm, n, salt, r, p, hash_)
+
+    def get_maxmem(self, n, r, p):
+        """Return the memory limit for hashing with n, r and p."""
+        return self.maxmem
+
+    def decode(self, encoded):
+        algorithm, work_factor, salt, block_size, parallelism, hash_ = (
+            encoded.split('$', 6)
+        )
+        assert algorithm == self.algorithm
+        return {
+            'algorithm': algorithm,
+            'work_factor': int(work_factor),
+            'salt': salt,
+            'block_size': int(block_size),
+            'parallelism': int(parallelism),
+            'hash': hash_,
+        }
+
+    def verify(self, password, encoded):
+        decoded = self.decode(encoded)
+        encoded_2 = self.encode(
+            password, decoded['salt'], decoded['work_factor'],
+            decoded['block_size'], decoded['parallelism'],
+        )
+        return constant_time_compare(encoded, encoded_2)
+
+    def safe_summary(self, encoded):
+        decoded = self.decode(encoded)
+        return {
+            _('algorithm'): decoded['algorithm'],
+            _('work factor'): decoded['work_factor'],
+            _('block size'): decoded['block_size'],
+            _('parallelism'): decoded['parallelism'],
+            _('salt'): mask_hash(decoded['salt']),
+            _('hash'): mask_hash(decoded['hash']),
+        }
+
+    def must_update(self, encoded):
+        decoded = self.decode(encoded)
+        return (
+            decoded['work_factor'] != self.work_factor
+            or decoded['block_size'] != self.block_size
+            or decoded['parallelism'] != self.parallelism
+        )
+
+    def harden_runtime(self, password, encoded):
+        # The runtime for scrypt is too complicated to harden.
+        pass
+
+
+class TunedScryptPasswordHasher(PooledHasherMixin, ScryptPasswordHasher):
+    """scrypt with costs from the SCRYPT_* settings."""
+
+    @property
+    def work_factor(self):
+        return settings.SCRYPT_WORK_FACTOR
+
+    @property
+    def block_size(self):
+        return settings.SCRYPT_BLOCK_SIZE
+
+    @property
+    def parallelism(self):
+        return settings.SCRYPT_PARALLELISM
+
+    def get_maxmem(self, n, r, p):
+        # 128 * n * r * p bytes plus headroom; OpenSSL defaults to 32 MiB.
+        # Derived from the costs in use, as verify passes the stored ones.
+        return 256 * n * r * p
+
+
+class PooledPBKDF2PasswordHasher(PooledHasherMixin, PBKDF2PasswordHasher):
+    """Django's default PBKDF2 hasher, run on the hashing pool."""
@@ -0,0 +1,140 @@
+"""
+Tests for cached token authentication.
+"""
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from user.authentication import (
+    invalidate_users,
+    token_cache_key,
+    user_cache_key,
+)
+
+ME_URL = reverse('user:me')
+RECIPES_URL = reverse('recipe:recipe-list')
+
+
+class CachedTokenAuthenticationTests(TestCase):
+    """Test authenticating with a cached token lookup."""
+
+    def setUp(self):
+        caches['auth'].clear()
+        self.user = get_user_model().objects.create_user(
+            email='user@example.com',
+            password='testpass123',
+            name='Test Name',
+        )
+        self.token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def test_token_lookup_cached(self):
+        """Test the token is looked up in the database only once."""
+        self.client.get(RECIPES_URL)
+
+        # The token, the user with its data version and the body are all
+        # cached.
+        with self.assertNumQueries(0):
+            res = self.client.get(RECIPES_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_write_refreshes_cached_data_version(self):
+        """Test a write changes the ETag of a user served from cache."""
+        etag = self.client.get(RECIPES_URL)['ETag']
+
+        self.client.post(RECIPES_URL, {
+            'title': 'Soup', 'time_minutes': 10, 'price': '2.50',
+        })
+        res = self.client.get(RECIPES_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['results'][0]['title'], 'Soup')
+        self.assertNotEqual(res['ETag'], etag)
+
+    def test_cached_user_needs_no_queries(self):
+        """Test a request with a cached token makes no auth queries."""
+        self.client.get(ME_URL)
+
+        with self.assertNumQueries(0):
+            res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['email'], self.user.email)
+
+    def test_invalid_token_rejected(self):
+        """Test an unknown token is rejected."""
+        self.client.credentials(HTTP_AUTHORIZATION='Token invalid')
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deleted_token_invalidated(self):
+        """Test deleting a token drops it from the cache."""
+        self.client.get(ME_URL)
+        self.token.delete()
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deactivated_user_invalidated(self):
+        """Test deactivating a user drops their cached token."""
+        self.client.get(ME_URL)
+        self.user.is_active = False
+        self.user.save()
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_bulk_deactivated_user_rejected(self):
+        """Test users deactivated in bulk are rejected once invalidated."""
+        self.client.get(ME_URL)
+        users = get_user_model().objects.filter(pk=self.user.pk)
+        users.update(is_active=False)
+        invalidate_users(users.values_list('pk', flat=True))
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_password_not_cached(self):
+        """Test the cached user snapshot leaves out the password hash."""
+        self.client.get(ME_URL)
+
+        cached = caches['auth'].get(token_cache_key(self.token.key))
+        snapshot = caches['auth'].get(user_cache_key(self.user.pk))
+
+        self.assertEqual(cached, self.user.pk)
+        self.assertEqual(snapshot['email'], self.user.email)
+        self.assertNotIn('password', snapshot)
+
+    def test_password_change_keeps_hash(self):
+        """Test saving a user built from the snapshot keeps the password."""
+        self.client.get(ME_URL)
+
+        res = self.client.patch(ME_URL, {'name': 'Updated Name'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.check_password('testpass123'))
+        res = self.client.patch(ME_URL, {'password': 'newpass123'})
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.check_password('newpass123'))
+
+    def test_user_update_invalidated(self):
+        """Test updating the profile refreshes the cached user."""
+        self.client.get(ME_URL)
+
+        res = self.client.patch(ME_URL, {'name': 'Updated Name'})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        res = self.client.get(ME_URL)
+        self.assertEqual(res.data['name'], 'Updated Name')
@@ -0,0 +1,124 @@
+"""
+Tests for the tuned, pooled password hashers.
+"""
+import threading
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import (
+    check_password,
+    get_hasher,
+    identify_hasher,
+    make_password,
+)
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from user import hashers
+
+TOKEN_URL = reverse('user:token')
+
+
+class HasherTests(TestCase):
+    """Test the hashers themselves."""
+
+    def tearDown(self):
+        hashers.shutdown_executor()
+
+    def test_argon2_uses_settings(self):
+        """Test Argon2 hashes carry the configured costs."""
+        with self.settings(ARGON2_TIME_COST=1, ARGON2_MEMORY_COST=1024):
+            encoded = make_password('pass123', hasher='argon2')
+
+        self.assertIn('m=1024,t=1,p=1', encoded)
+        self.assertTrue(check_password('pass123', encoded))
+        self.assertTrue(get_hasher('argon2').must_update(encoded))
+
+    def test_scrypt_round_trip(self):
+        """Test scrypt hashes verify and record their costs."""
+        with self.settings(SCRYPT_WORK_FACTOR=2 ** 10):
+            encoded = make_password('pass123', hasher='scrypt')
+            hasher = identify_hasher(encoded)
+
+            self.assertTrue(encoded.startswith('scrypt$1024$'))
+            self.assertTrue(hasher.verify('pass123', encoded))
+            self.assertFalse(hasher.verify('wrong', encoded))
+            self.assertFalse(hasher.must_update(encoded))
+
+        self.assertTrue(hasher.must_update(encoded))
+
+    def test_hashing_runs_on_pool(self):
+        """Test hashes run on the pool, and nested hashes run inline."""
+        with self.settings(PASSWORD_HASH_THREADS=1):
+            hashers.shutdown_executor()
+            thread = hashers.run_hashing(
+                hashers.run_hashing, threading.current_thread,
+            )
+
+        self.assertTrue(thread.name.startswith('password-hash'))
+
+
+class LoginHashingTests(TestCase):
+    """Test logins rehash passwords and respect the pool's limits."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.payload = {'email': 'user@example.com', 'password': 'pass123@'}
+        self.user = get_user_model().objects.create_user(**self.payload)
+
+    def tearDown(self):
+        hashers.shutdown_executor()
+
+    def test_login_upgrades_legacy_hash(self):
+        """Test a PBKDF2 password is rehashed with Argon2 on login."""
+        self.user.password = make_password(
+            self.payload['password'], hasher='pbkdf2_sha256',
+        )
+        self.user.save()
+
+        res = self.client.post(TOKEN_URL, self.payload)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertEqual(identify_hasher(self.user.password).algorithm,
+                         'argon2')
+
+    def test_login_after_lowering_scrypt_cost(self):
+        """Test scrypt hashes stronger than the settings still verify."""
+        scrypt_first = ['user.hashers.TunedScryptPasswordHasher']
+        # 64 MiB of memory, above OpenSSL's default limit.
+        with self.settings(SCRYPT_WORK_FACTOR=2 ** 16):
+            self.user.password = make_password(
+                self.payload['password'], hasher='scrypt',
+            )
+        self.user.save()
+
+        with self.settings(PASSWORD_HASHERS=scrypt_first,
+                           SCRYPT_WORK_FACTOR=2 ** 10):
+            res = self.client.post(TOKEN_URL, self.payload)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith('scrypt$1024$'))
+
+    def test_login_busy_returns_429(self):
+        """Test logins are refused while the hashing pool is saturated."""
+        release = threading.Event()
+        with self.settings(PASSWORD_HASH_THREADS=1, PASSWORD_HASH_QUEUE=0,
+                           PASSWORD_HASH_WAIT=0.01):
+            hashers.shutdown_executor()
+            started = threading.Event()
+            blocker = threading.Thread(
+                target=hashers.run_hashing,
+                args=(lambda: started.set() or release.wait(),),
+            )
+            blocker.start()
+            try:
+                started.wait()
+                res = self.client.post(TOKEN_URL, self.payload)
+            finally:
+                release.set()
+                blocker.join()
+
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
@@ -0,0 +1,37 @@
+upstream app {
+    server ${APP_HOST}:${APP_PORT};
+    keepalive 32;
+}
+
+server {
+    listen ${LISTEN_PORT};
+
+    proxy_http_version 1.1;
+    proxy_set_header   Connection "";
+    proxy_set_header   Host $host;
+    proxy_set_header   X-Forwarded-For $proxy_add_x_forwarded_for;
+    proxy_set_header   X-Forwarded-Proto $scheme;
+
+    # Compress larger API responses; static files are precompressed.
+    gzip            on;
+    gzip_types      application/json application/vnd.oai.openapi
+                    application/vnd.oai.openapi+json application/yaml;
+    gzip_min_length 1024;
+    gzip_comp_level 5;
+    gzip_proxied    any;
+    gzip_vary       on;
+
+    include /etc/nginx/static.conf;
+
+    location /api/recipe/recipes/import/ {
+        proxy_pass              http://app;
+        client_max_body_size    500M;
+        proxy_request_buffering off;
+        proxy_read_timeout      600s;
+    }
+
+    location / {
+        proxy_pass              http://app;
+        client_max_body_size    10M;
+    }
+}
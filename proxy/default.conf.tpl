@@ -1,8 +1,23 @@
 server {
     listen ${LISTEN_PORT};
 
-    location /static {
-        alias /vol/static;
+    # Compress larger API responses; static files are precompressed.
+    gzip            on;
+    gzip_types      application/json application/vnd.oai.openapi
+                    application/vnd.oai.openapi+json application/yaml;
+    gzip_min_length 1024;
+    gzip_comp_level 5;
+    gzip_proxied    any;
+    gzip_vary       on;
+
+    include /etc/nginx/static.conf;
+
+    location /api/recipe/recipes/import/ {
+        uwsgi_pass              ${APP_HOST}:${APP_PORT};
+        include                 /etc/nginx/uwsgi_params;
+        client_max_body_size    500M;
+        uwsgi_request_buffering off;
+        uwsgi_read_timeout      600s;
     }
 
     location / {
@@ -2,5 +2,13 @@
 
 set -e
 
-envsubst < /etc/nginx/default.conf.tpl > /etc/nginx/conf.d/default.conf
+# The app speaks uwsgi in wsgi mode and plain HTTP in asgi mode.
+if [ "${SERVER_MODE:-wsgi}" = "asgi" ]; then
+    template=/etc/nginx/asgi.conf.tpl
+else
+    template=/etc/nginx/default.conf.tpl
+fi
+
+envsubst '${LISTEN_PORT} ${APP_HOST} ${APP_PORT}' \
+    < "$template" > /etc/nginx/conf.d/default.conf
 nginx -g 'daemon off;'
\ No newline at end of file
@@ -2,8 +2,65 @@
 
 set -e
 
-python manage.py wait_for_db
-python manage.py collectstatic --noinput
-python manage.py migrate
+# collectstatic and build_schema run when the image is built (see
+# Dockerfile). Copy the static files to the volume the proxy serves, unless
+# this build's files are already there, while waiting for the database.
+sync_static() {
+    marker=/vol/web/static/.build-manifest.json
+    if ! cmp -s /build/static/staticfiles.json "$marker"; then
+        cp -R /build/static/. /vol/web/static/
+        cp /build/static/staticfiles.json "$marker"
+    fi
+}
+sync_static &
+sync_pid=$!
 
-uwsgi --socket :9000 --workers 4 --master --enable-threads --module app.wsgi
\ No newline at end of file
+python manage.py wait_for_db --timeout "${DB_WAIT_TIMEOUT:-60}"
+# migrate also runs its post-migrate handlers, so skip it when
+# showmigrations lists nothing unapplied.
+plan=$(python manage.py showmigrations --plan)
+if echo "$plan" | grep -q '^\[ \]'; then
+    python manage.py migrate
+fi
+wait "$sync_pid"
+
+# Workers write their metrics here so /metrics can report all of them.
+export PROMETHEUS_MULTIPROC_DIR=${PROMETHEUS_MULTIPROC_DIR:-/vol/metrics}
+mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+rm -f "$PROMETHEUS_MULTIPROC_DIR"/*.db
+
+if [ "${SERVER_MODE:-wsgi}" = "asgi" ]; then
+    exec uvicorn app.asgi:application --host 0.0.0.0 --port 9000 \
+        --workers "${ASGI_WORKERS:-4}" --proxy-headers --no-server-header
+fi
+
+# uWSGI also reads UWSGI_* variables itself; they are spelled out here so
+# the defaults are visible in one place. --harakiri is the ceiling for bulk
+# imports/exports; core.timeouts cuts other requests to UWSGI_HARAKIRI.
+set -- \
+    --processes "${UWSGI_PROCESSES:-4}" \
+    --threads "${UWSGI_THREADS:-2}" \
+    --listen "${UWSGI_LISTEN:-128}" \
+    --harakiri "${UWSGI_BULK_HARAKIRI:-600}" \
+    --max-requests "${UWSGI_MAX_REQUESTS:-5000}" \
+    --max-requests-delta "${UWSGI_MAX_REQUESTS_DELTA:-250}"
+
+# Cheaper mode: keep UWSGI_CHEAPER workers running and spawn up to
+# UWSGI_PROCESSES, UWSGI_CHEAPER_STEP at a time, while every worker is busy.
+if [ "${UWSGI_CHEAPER:-0}" -gt 0 ]; then
+    set -- "$@" \
+        --cheaper "$UWSGI_CHEAPER" \
+        --cheaper-initial "${UWSGI_CHEAPER_INITIAL:-$UWSGI_CHEAPER}" \
+        --cheaper-step "${UWSGI_CHEAPER_STEP:-1}" \
+        --cheaper-overload "${UWSGI_CHEAPER_OVERLOAD:-5}"
+fi
+
+# Read by core.metrics and exported on /metrics.
+if [ -n "${UWSGI_STATS}" ]; then
+    set -- "$@" --stats "$UWSGI_STATS" --memory-report
+fi
+
+# The app is imported once in the master (no --lazy-apps) and the workers
+# are forked from it, sharing its memory copy-on-write.
+exec uwsgi --socket :9000 --master --module app.wsgi --need-app \
+    --enable-threads --thunder-lock --die-on-term --harakiri-verbose "$@"